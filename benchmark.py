@@ -0,0 +1,538 @@
+# benchmark.py
+
+# Description: Benchmark suite for the hot functions of wordle.py: check, find_matched_words,
+# find_words_with_letters, FrequencySorter.sort_frequencies, WordValidator.validate and a full autoplay game. Every
+# benchmark runs on the bundled word list and on synthetic lists of random words, and reports the calls per second,
+# the per-call latency percentiles and the peak memory of a call (measured with tracemalloc). The results can be
+# written as JSON and compared against a saved baseline to flag regressions.
+# With --store, it compares the memory per word and validation latency of a plain list and of the packed WordStore.
+# With --sessions, it plays that many games (100k by default) through the headless GameSession API, interleaving
+# a number of live sessions, and fails unless every game finishes.
+# With --boards, it solves random sets of K secret words with the multi-board solver and checks the results against
+# BOARD_TARGETS (K=4 and K=8).
+# With --parity, it instead runs randomized constraint sets through the NumPy and the pure-Python implementations of
+# find_matched_words and find_words_with_letters (and through ConstraintIndex), compares the vectorized scorer of
+# the pattern matrix with score, and fails on any difference.
+# Usage: python benchmark.py [--sizes bundled,10000,100000,1000000] [--budget SECONDS] [--output results.json]
+#                            [--baseline baseline.json] [--threshold 0.1] [--only check,validate]
+#        python benchmark.py --store [--calls N]
+#        python benchmark.py --sessions [GAMES] [--concurrency N]
+#        python benchmark.py --boards 4,8 [--board-sizes bundled,50000] [--games N]
+#        python benchmark.py --parity ROUNDS
+
+import argparse
+import json
+import platform
+import sys
+import tracemalloc
+from random import Random
+from time import perf_counter, perf_counter_ns
+from typing import Optional
+
+from wordle import (FileHandler, WordStore, WordValidator, ConstraintIndex, FrequencySorter, AutoplayMode, GameSession,
+                    MultiBoardSolver, check, score, FeedbackEngine, word_matrix, find_words_with_letters,
+                    find_words_with_letters_python, find_matched_words, find_matched_words_python, percentile)
+
+ALPHABET = "abcdefghijklmnopqrstuvwxyz"
+# The performance targets of the multi-board solver per number of boards: the worst number of guesses of a game
+# (the limits of Quordle and Octordle, past which a game is lost) and the mean solving time of a game, on the bundled
+# list and on 50k words
+BOARD_TARGETS = {4: {"max_guesses": 9, "ms_per_game": 250.0}, 8: {"max_guesses": 13, "ms_per_game": 600.0}}
+
+
+def time_calls(function, inputs: [list], budget: Optional[float] = None, min_calls: [int] = 3) -> dict:
+    """
+    Calls a function once per input and measures the latency of every call.
+    :param function: the function to measure, called with the arguments of one input tuple
+    :param inputs: the argument tuples of the calls
+    :param budget: stop after this many seconds (once min_calls calls are made), by default make every call
+    :param min_calls: the minimum number of calls made within the budget
+    :return: a dictionary with the calls per second and the latency percentiles in microseconds
+    """
+    latencies = []
+    deadline = None if budget is None else perf_counter() + budget
+    for arguments in inputs:
+        start = perf_counter_ns()
+        function(*arguments)
+        latencies.append(perf_counter_ns() - start)
+        if deadline is not None and len(latencies) >= min_calls and perf_counter() > deadline:
+            break
+    latencies.sort()
+
+    return {
+        "calls": len(latencies),
+        "ops_per_sec": len(latencies) / (sum(latencies) / 1e9),
+        "p50_us": percentile(latencies, 0.50) / 1e3,
+        "p90_us": percentile(latencies, 0.90) / 1e3,
+        "p99_us": percentile(latencies, 0.99) / 1e3,
+    }
+
+
+def list_bytes_per_word(words: [list]) -> float:
+    """
+    Returns the memory used per word by a list of Python strings, including the list itself.
+    :param words: a list of words
+    :return: a number of bytes
+    """
+    return (sys.getsizeof(words) + sum(sys.getsizeof(word) for word in words)) / len(words)
+
+
+def bench_word_store(words: [list], calls: [int], seed: [int] = 0) -> dict:
+    """
+    Compares a list of words and a WordStore of the same words.
+    :param words: the list of words
+    :param calls: the number of validations to measure
+    :param seed: the seed used to pick the guesses
+    :return: a dictionary with the memory per word and the validation latencies of both
+    """
+    word_length = len(words[0])
+    store = WordStore.from_words(words, word_length)
+    rng = Random(seed)
+    # Half accepted words, half well-formed words which are not in the list
+    guesses = [(rng.choice(words) if i % 2 else "".join(rng.choice("aeiouxyz") for _ in range(word_length)),)
+               for i in range(calls)]
+
+    return {
+        "words": len(words),
+        "list": {
+            "bytes_per_word": list_bytes_per_word(words),
+            "validate": time_calls(WordValidator(words, word_length).validate, guesses),
+        },
+        "store": {
+            "bytes_per_word": store.nbytes() / len(store),
+            "validate": time_calls(WordValidator(store, word_length).validate, guesses),
+        },
+    }
+
+
+def random_constraints(rng: [Random], word_length: [int]) -> tuple:
+    """
+    Draws a random set of gray, yellow and green constraints, in the form expected by find_matched_words.
+    :param rng: the random number generator
+    :param word_length: the number of letters of the words
+    :return: a tuple of the grays, yellows and greens
+    """
+    grays = rng.sample(ALPHABET, rng.randint(0, 6))
+    yellows = {letter: set(rng.sample(range(word_length), rng.randint(1, 3)))
+               for letter in rng.sample(ALPHABET, rng.randint(0, 3))}
+    greens = {letter: set(rng.sample(range(word_length), rng.randint(1, 2)))
+              for letter in rng.sample(ALPHABET, rng.randint(0, 3))}
+
+    return grays, yellows, greens
+
+
+def random_counts(rng: [Random], word_length: [int]) -> dict:
+    """
+    Draws a random count constraint, in the form expected by find_matched_words.
+    :param rng: the random number generator
+    :param word_length: the number of letters of the words
+    :return: a dictionary of letters to (minimum, maximum) numbers of occurrences
+    """
+    counts = {}
+    for letter in rng.sample(ALPHABET, rng.randint(0, 2)):
+        minimum = rng.randint(0, 2)
+        counts[letter] = (minimum, rng.randint(minimum, word_length))
+
+    return counts
+
+
+def check_parity(words: [list], rounds: [int], seed: [int] = 0) -> int:
+    """
+    Runs randomized constraint sets through the vectorized and the pure-Python implementations and checks that
+    they return the same results, on the whole list and on random sublists.
+    :param words: the list of words
+    :param rounds: the number of random constraint sets
+    :param seed: the seed of the constraint sets
+    :return: the number of comparisons made
+    """
+    if word_matrix(words) is None:
+        raise RuntimeError("NumPy is required to check the parity of the vectorized implementations.")
+    rng = Random(seed)
+    word_length = len(words[0])
+    index = ConstraintIndex(words)
+    comparisons = 0
+
+    for round_number in range(rounds):
+        grays, yellows, greens = random_constraints(rng, word_length)
+        counts = random_counts(rng, word_length)
+        sublist = words if round_number % 2 else rng.sample(words, rng.randint(64, 2000))
+        for command in ("word", "list"):
+            expected = find_matched_words_python(sublist, grays, yellows, greens, command, counts)
+            results = [find_matched_words(sublist, grays, yellows, greens, command, counts)]
+            if sublist is words:
+                results.append(index.find_matched_words(grays, yellows, greens, command, counts=counts))
+            for result in results:
+                if result != expected:
+                    raise AssertionError("find_matched_words differs for "
+                                         + repr((grays, yellows, greens, command, counts)))
+                comparisons += 1
+
+        letters = rng.sample(ALPHABET, rng.randint(0, 4))
+        expected = find_words_with_letters_python(sublist, letters)
+        if find_words_with_letters(sublist, letters) != expected:
+            raise AssertionError("find_words_with_letters differs for " + repr(letters))
+        comparisons += 1
+
+    # The vectorized scorer of the pattern matrix against score, on random guesses and secrets
+    engine = FeedbackEngine(words)
+    for _ in range(rounds):
+        guess_ids = rng.sample(range(len(words)), 32)
+        secret_ids = rng.sample(range(len(words)), 32)
+        block = engine.pattern_block(guess_ids, secret_ids)
+        for row, guess_id in enumerate(guess_ids):
+            for column, secret_id in enumerate(secret_ids):
+                if int(block[row, column]) != score(words[secret_id], words[guess_id]):
+                    raise AssertionError("pattern_block differs for " + repr((words[guess_id], words[secret_id])))
+        comparisons += len(guess_ids) * len(secret_ids)
+
+    return comparisons
+
+
+def bench_sessions(words: [list], games: [int], concurrency: [int] = 1000, max_guesses: [int] = 6,
+                   seed: [int] = 0) -> dict:
+    """
+    Plays games through the headless GameSession API with random guesses. The live sessions are stepped one guess
+    at a time in turn, as an event loop would, and each one starts a new game in place when its game is over.
+    :param words: the list of accepted words
+    :param games: the number of games to play
+    :param concurrency: the number of sessions in progress at the same time
+    :param max_guesses: the number of guesses after which a game is lost
+    :param seed: the seed of the secret words and the guesses
+    :return: a dictionary with the games won and lost, the guesses and the games and guesses per second
+    """
+    rng = Random(seed)
+    validator = WordValidator(words, len(words[0]))
+    guesses = [words[rng.randrange(len(words))] for _ in range(4096)]
+    sessions = [GameSession(words, validator=validator, max_guesses=max_guesses, rng=rng)
+                for _ in range(min(concurrency, games))]
+    started, finished, won, submitted = len(sessions), 0, 0, 0
+
+    start = perf_counter()
+    while sessions:
+        live = []
+        for session in sessions:
+            error, _ = session.submit_guess(guesses[submitted & 4095])
+            if error is not None:
+                raise AssertionError("GameSession rejected " + guesses[submitted & 4095] + ": " + error)
+            submitted += 1
+            if session.status == "PLAYING":
+                live.append(session)
+                continue
+            finished += 1
+            won += session.status == "WON"
+            if started < games:
+                live.append(session.new_game())
+                started += 1
+        sessions = live
+    elapsed = perf_counter() - start
+
+    if finished != games:
+        raise AssertionError("Only " + str(finished) + " of " + str(games) + " games finished")
+
+    return {
+        "games": finished,
+        "won": won,
+        "lost": finished - won,
+        "guesses": submitted,
+        "seconds": elapsed,
+        "games_per_second": finished / elapsed,
+        "guesses_per_second": submitted / elapsed,
+    }
+
+
+def bench_boards(words: [list], boards: [int], games: [int], seed: [int] = 0) -> dict:
+    """
+    Solves random sets of secret words with the multi-board solver. The solver (and the pattern matrix of lists
+    small enough for one) is set up before the clock starts.
+    :param words: the list of words
+    :param boards: the number of secret words of every game
+    :param games: the number of games
+    :param seed: the seed of the secret words
+    :return: a dictionary with the mean and worst number of guesses, the share of the games lost (over the guess
+        limit of the target), the mean time of a game and the targets met
+    """
+    rng = Random(seed)
+    solver = MultiBoardSolver(words)
+    solver.get_opening()
+    guesses, times = [], []
+
+    for _ in range(games):
+        secrets = rng.sample(range(len(words)), boards)
+        start = perf_counter()
+        guesses.append(sum(1 for _ in solver.solve([words[secret] for secret in secrets])))
+        times.append(perf_counter() - start)
+
+    results = {
+        "boards": boards,
+        "games": games,
+        "mean_guesses": sum(guesses) / games,
+        "max_guesses": max(guesses),
+        "ms_per_game": 1e3 * sum(times) / games,
+        "p99_ms": 1e3 * percentile(sorted(times), 0.99),
+    }
+    target = BOARD_TARGETS.get(boards)
+    if target is not None:
+        results["loss_rate"] = sum(1 for count in guesses if count > target["max_guesses"]) / games
+        results["target_met"] = (results["max_guesses"] <= target["max_guesses"]
+                                 and results["ms_per_game"] <= target["ms_per_game"])
+
+    return results
+
+
+def synthetic_words(count: [int], word_length: [int] = 5, seed: [int] = 0) -> [list]:
+    """
+    Generates a list of distinct random words, used to benchmark lists larger than the bundled one.
+    :param count: the number of words
+    :param word_length: the number of letters of every word
+    :param seed: the seed of the generator
+    :return: a list of words
+    """
+    rng = Random(seed)
+    words = set()
+    while len(words) < count:
+        words.update("".join(rng.choices(ALPHABET, k=word_length)) for _ in range(count - len(words)))
+
+    return sorted(words)
+
+
+def autoplay_game(autoplay: [AutoplayMode], secret: [str], seed: [int]) -> int:
+    """
+    Plays a full headless autoplay game.
+    :param autoplay: the solver
+    :param secret: the secret word
+    :param seed: the seed of the solver's random choices
+    :return: the number of guesses
+    """
+    return sum(1 for _ in autoplay.solve(secret, Random(seed)))
+
+
+def setup_benchmarks(store: [WordStore], rng: [Random], calls: [int]) -> dict:
+    """
+    Prepares every benchmark on a word store: the function to call and the arguments of every call. The setup work
+    (building the sorter, validator and solver) is not measured.
+    :param store: the words to benchmark on, in the WordStore shared by the components of the game
+    :param rng: the random number generator of the inputs
+    :param calls: the maximum number of calls of every benchmark
+    :return: a dictionary of benchmark names to (function, list of argument tuples)
+    """
+    word_length = store.word_length
+    sorter = FrequencySorter(store)
+    validator = WordValidator(store, word_length)
+    words = [store[rng.randrange(len(store))] for _ in range(2 * calls)]
+
+    benchmarks = {
+        "check": (check, [(words[i], words[-i - 1]) for i in range(calls)]),
+        "find_matched_words": (find_matched_words,
+                               [(store,) + random_constraints(rng, word_length) + ("list",) for _ in range(calls)]),
+        "find_words_with_letters": (find_words_with_letters,
+                                    [(store, rng.sample(ALPHABET, rng.randint(1, 3))) for _ in range(calls)]),
+        "sort_frequencies": (sorter.sort_frequencies, [("returntopfive",)] * calls),
+        "validate": (validator.validate,
+                     [(words[i] if i % 2 else "".join(rng.choices("aeiouxyz", k=word_length)),) for i in range(calls)]),
+    }
+    autoplay = AutoplayMode(store, "random", sorter=sorter)
+    benchmarks["autoplay_game"] = (lambda secret, seed: autoplay_game(autoplay, secret, seed),
+                                   [(words[i], i) for i in range(calls)])
+
+    return benchmarks
+
+
+def peak_memory(function, inputs: [list]) -> int:
+    """
+    Measures the peak memory allocated by the first calls of a function, with tracemalloc.
+    :param function: the function to measure
+    :param inputs: the argument tuples of the calls; at most three are used
+    :return: the peak number of bytes allocated during a call
+    """
+    peak = 0
+    tracemalloc.start()
+    try:
+        for arguments in inputs[:3]:
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+            function(*arguments)
+            peak = max(peak, tracemalloc.get_traced_memory()[1] - baseline)
+    finally:
+        tracemalloc.stop()
+
+    return peak
+
+
+def load_dataset(name: [str], words_path: [str], word_length: [int] = 5) -> WordStore:
+    """
+    Loads the words of a dataset: "bundled" for the word list file, or a number of synthetic words.
+    :param name: the name of the dataset
+    :param words_path: the path of the bundled word list
+    :param word_length: the number of letters of the words
+    :return: the words of the dataset, in a WordStore
+    """
+    if name == "bundled":
+        return FileHandler(words_path, []).get_word_store(word_length)
+
+    return WordStore.from_words(synthetic_words(int(name), word_length), word_length)
+
+
+def run_suite(datasets: [list], words_path: [str], budget: [float], calls: [int], only: Optional[list] = None,
+              seed: [int] = 0, word_length: [int] = 5) -> dict:
+    """
+    Runs every benchmark on every dataset.
+    :param datasets: the names of the datasets, see load_dataset
+    :param words_path: the path of the bundled word list
+    :param budget: the time in seconds given to every benchmark
+    :param calls: the maximum number of calls of every benchmark
+    :param only: the names of the benchmarks to run, by default all of them
+    :param seed: the seed of the inputs
+    :param word_length: the number of letters of the words
+    :return: a dictionary of the environment and the results per dataset and benchmark
+    """
+    results = {}
+    for name in datasets:
+        store = load_dataset(name, words_path, word_length)
+        benchmarks = setup_benchmarks(store, Random(seed), calls)
+        results[name] = {}
+        for benchmark, (function, inputs) in benchmarks.items():
+            if only and benchmark not in only:
+                continue
+            stats = time_calls(function, inputs, budget)
+            stats["peak_memory_kb"] = peak_memory(function, inputs) / 1024
+            results[name][benchmark] = stats
+            print(format_row(name, len(store), benchmark, stats), flush=True)
+
+    return {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": results,
+    }
+
+
+def format_row(dataset: [str], words: [int], benchmark: [str], stats: [dict]) -> str:
+    """
+    Formats the result of one benchmark as a row of the report.
+    :param dataset: the name of the dataset
+    :param words: the number of words of the dataset
+    :param benchmark: the name of the benchmark
+    :param stats: the result of the benchmark
+    :return: the row
+    """
+    return (dataset.ljust(8) + str(words).rjust(8) + "  " + benchmark.ljust(24) + format(stats["ops_per_sec"], "12.1f")
+            + format(stats["p50_us"], "12.2f") + format(stats["p90_us"], "12.2f") + format(stats["p99_us"], "12.2f")
+            + format(stats["peak_memory_kb"], "12.1f"))
+
+
+def compare(results: [dict], baseline: [dict], threshold: [float]) -> [list]:
+    """
+    Compares results against a baseline and lists the benchmarks which became slower than the threshold allows.
+    :param results: the results of run_suite
+    :param baseline: earlier results of run_suite
+    :param threshold: the tolerated slowdown, e.g. 0.1 for 10% fewer calls per second
+    :return: a list of messages, one per regression
+    """
+    regressions = []
+    for dataset, benchmarks in results["results"].items():
+        for benchmark, stats in benchmarks.items():
+            before = baseline.get("results", {}).get(dataset, {}).get(benchmark)
+            if before is None:
+                continue
+            change = stats["ops_per_sec"] / before["ops_per_sec"] - 1
+            if change < -threshold:
+                regressions.append(dataset + " " + benchmark + ": " + format(before["ops_per_sec"], ".1f") + " -> "
+                                   + format(stats["ops_per_sec"], ".1f") + " ops/sec (" + format(100 * change, "+.1f")
+                                   + "%)")
+
+    return regressions
+
+
+def format_results(results: [dict]) -> str:
+    """
+    Formats the results of bench_word_store as a text table.
+    :param results: the results to format
+    :return: the table
+    """
+    lines = ["Words: " + str(results["words"]),
+             "storage  bytes/word   validate/s    p50 us    p99 us"]
+    for name in ("list", "store"):
+        entry = results[name]
+        latency = entry["validate"]
+        lines.append(name.ljust(8) + format(entry["bytes_per_word"], "11.1f") + format(latency["ops_per_sec"], "13.0f")
+                     + format(latency["p50_us"], "10.2f") + format(latency["p99_us"], "10.2f"))
+
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the hot functions of wordle.py.")
+    parser.add_argument("--words", default="wordles.txt", help="path to the word list")
+    parser.add_argument("--sizes", default="bundled,10000,100000,1000000",
+                        help="comma-separated datasets: 'bundled' and/or numbers of synthetic words")
+    parser.add_argument("--length", type=int, default=5, choices=range(4, 13), metavar="{4..12}",
+                        help="number of letters of the words")
+    parser.add_argument("--budget", type=float, default=1.0, help="seconds given to every benchmark")
+    parser.add_argument("--calls", type=int, default=2000, help="maximum number of calls of every benchmark")
+    parser.add_argument("--only", default=None, help="comma-separated names of the benchmarks to run")
+    parser.add_argument("--output", default=None, help="write the results as JSON to this file")
+    parser.add_argument("--baseline", default=None, help="compare the results against this JSON file")
+    parser.add_argument("--threshold", type=float, default=0.1, help="tolerated slowdown against the baseline")
+    parser.add_argument("--store", action="store_true", help="compare a list of words with the packed WordStore")
+    parser.add_argument("--sessions", type=int, nargs="?", const=100000, default=None, metavar="GAMES",
+                        help="play GAMES games (default 100000) through the GameSession API")
+    parser.add_argument("--concurrency", type=int, default=1000, help="sessions in progress at once (--sessions)")
+    parser.add_argument("--boards", default=None, help="comma-separated numbers of boards of the multi-board solver")
+    parser.add_argument("--board-sizes", default="bundled,50000", help="datasets of the multi-board benchmark")
+    parser.add_argument("--games", type=int, default=200, help="games per number of boards (--boards)")
+    parser.add_argument("--parity", type=int, default=None, metavar="ROUNDS",
+                        help="check the vectorized implementations against the pure-Python ones")
+    args = parser.parse_args()
+
+    if args.parity is not None:
+        words = FileHandler(args.words, []).get_words_from_file()
+        print("Parity OK: " + str(check_parity(words, args.parity)) + " comparisons")
+        return
+    if args.sessions is not None:
+        words = FileHandler(args.words, []).get_word_store(args.length)
+        results = bench_sessions(words, args.sessions, args.concurrency)
+        print("Games: " + str(results["games"]) + " (" + str(results["won"]) + " won, " + str(results["lost"])
+              + " lost), guesses: " + str(results["guesses"]))
+        print("Games/second: " + format(results["games_per_second"], ".0f") + ", guesses/second: "
+              + format(results["guesses_per_second"], ".0f"))
+        return
+    if args.boards is not None:
+        print("dataset    words  boards  mean guesses  max guesses     lost  ms/game   p99 ms  target")
+        missed = False
+        for name in args.board_sizes.split(","):
+            store = load_dataset(name, args.words, args.length)
+            for boards in (int(boards) for boards in args.boards.split(",")):
+                results = bench_boards(store, boards, args.games)
+                met = results.get("target_met")
+                missed = missed or met is False
+                print(name.ljust(8) + str(len(store)).rjust(8) + str(boards).rjust(8)
+                      + format(results["mean_guesses"], "14.2f") + str(results["max_guesses"]).rjust(13)
+                      + ("      n/a" if met is None else format(results["loss_rate"], "9.2%"))
+                      + format(results["ms_per_game"], "9.1f") + format(results["p99_ms"], "9.1f")
+                      + ("  n/a" if met is None else "  met" if met else "  MISSED"), flush=True)
+        if missed:
+            sys.exit(1)
+        return
+    if args.store:
+        words = FileHandler(args.words, []).get_words_from_file()
+        print(format_results(bench_word_store(words, args.calls)))
+        return
+
+    print("dataset    words  benchmark                    ops/sec      p50 us      p90 us      p99 us     peak kb")
+    results = run_suite(args.sizes.split(","), args.words, args.budget, args.calls,
+                        args.only.split(",") if args.only else None, word_length=args.length)
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(results, file, indent=2)
+    if args.baseline:
+        with open(args.baseline, 'r') as file:
+            regressions = compare(results, json.load(file), args.threshold)
+        for regression in regressions:
+            print("REGRESSION " + regression)
+        if regressions:
+            sys.exit(1)
+        print("No regressions against " + args.baseline)
+
+
+if __name__ == '__main__':
+    main()
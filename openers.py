@@ -0,0 +1,111 @@
+# openers.py
+
+# Description: Offline evaluator of every word of the word list as the first guess of wordle.py. Each word is scored
+# against every secret by the entropy of its feedback, the expected number of remaining candidates and the size of
+# its worst-case bucket. The guesses are split into chunks scored by worker processes, which all read one letter
+# matrix placed in shared memory instead of receiving a copy of it. The ranked table is stored in .wordle_cache/, where
+# the "random" and "frequency" autoplay strategies load their opener from, and the best openers are printed.
+# Usage: python openers.py [--words wordles.txt] [--length 5] [--workers N] [--chunk-size N] [--top N]
+#                          [--rank entropy|expected|worst]
+
+
+import argparse
+import os
+from time import perf_counter
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Optional
+
+import numpy as np
+
+from wordle import WordCache, FeedbackEngine, OpeningTable, opening_stats
+
+_memory = None  # the shared memory block of the letter matrix, kept open by the current worker process
+_letters = None  # the letter matrix of the current worker process, a view of the shared memory
+
+
+def init_worker(name: [str], shape: tuple):
+    """
+    Initializes a worker process with a view of the letter matrix placed in shared memory by the parent process.
+    :param name: the name of the shared memory block
+    :param shape: the (N, word_length) shape of the letter matrix
+    """
+    global _memory, _letters
+    _memory = shared_memory.SharedMemory(name=name)
+    _letters = np.ndarray(shape, dtype=np.uint8, buffer=_memory.buf)
+
+
+def score_chunk(start: [int], stop: [int]) -> tuple:
+    """
+    Scores a chunk of consecutive guesses as openers, in a worker process.
+    :param start: the id of the first guess of the chunk
+    :param stop: the id after the last guess of the chunk
+    :return: a tuple of the first id and the entropy, expected remaining candidates and worst case arrays of the chunk
+    """
+    return (start,) + opening_stats(_letters, range(start, stop))
+
+
+def evaluate_openers(words_list: [list], workers: Optional[int] = None, chunk_size: [int] = 256) -> OpeningTable:
+    """
+    Scores every word of a list as the opener, spreading chunks of guesses over worker processes.
+    :param words_list: the list of words, used both as the guesses and as the secret words
+    :param workers: the number of worker processes, by default one per CPU; 1 scores in this process
+    :param chunk_size: the number of guesses per task sent to a worker
+    :return: the ranked table
+    """
+    letters = FeedbackEngine(words_list).word_matrix()
+    count = len(words_list)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        return OpeningTable.from_stats(words_list, *opening_stats(letters, range(count)))
+
+    entropy = np.empty(count)
+    expected = np.empty(count)
+    worst = np.empty(count, dtype=np.int64)
+    starts = range(0, count, chunk_size)
+    stops = [min(start + chunk_size, count) for start in starts]
+
+    memory = shared_memory.SharedMemory(create=True, size=max(letters.nbytes, 1))
+    try:
+        np.ndarray(letters.shape, dtype=np.uint8, buffer=memory.buf)[:] = letters
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                                 initargs=(memory.name, letters.shape)) as executor:
+            for start, *chunk in executor.map(score_chunk, starts, stops):
+                stop = start + len(chunk[0])
+                entropy[start:stop], expected[start:stop], worst[start:stop] = chunk
+    finally:
+        memory.close()
+        memory.unlink()
+
+    return OpeningTable.from_stats(words_list, entropy, expected, worst)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rank every word of the word list as the first guess.")
+    parser.add_argument("--words", default="wordles.txt", help="path to the word list")
+    parser.add_argument("--length", type=int, default=5, choices=range(4, 13), metavar="{4..12}",
+                        help="number of letters of the words")
+    parser.add_argument("--workers", type=int, default=None, help="number of worker processes (default: CPU count)")
+    parser.add_argument("--chunk-size", type=int, default=256, help="guesses per task sent to a worker")
+    parser.add_argument("--top", type=int, default=20, help="number of openers to print")
+    parser.add_argument("--rank", choices=OpeningTable.METRICS, default="entropy",
+                        help="metric the printed openers are ranked by")
+    args = parser.parse_args()
+
+    words_list = WordCache(args.words, args.length).get().store
+
+    start = perf_counter()
+    table = evaluate_openers(words_list, args.workers, args.chunk_size)
+    path = table.save()
+    print("Scored " + str(len(words_list)) + " openers against " + str(len(words_list)) + " secrets in "
+          + format(perf_counter() - start, ".1f") + " s, saved to " + path)
+
+    print("rank  word" + " " * max(args.length - 4, 0) + "  entropy  expected  worst")
+    for rank, row in enumerate(table.ranked(args.rank)[:args.top], start=1):
+        word = words_list[int(row["word_id"])]
+        print(str(rank).rjust(4) + "  " + word.ljust(max(args.length, 4)) + "  " + format(float(row["entropy"]), "7.4f")
+              + "  " + format(float(row["expected"]), "8.2f") + "  " + str(int(row["worst"])).rjust(5))
+
+
+if __name__ == '__main__':
+    main()
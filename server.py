@@ -0,0 +1,247 @@
+# server.py
+
+# Description: Asyncio game server for wordle.py. Every TCP connection holds one light GameSession (the secret word
+# and the guesses with their feedback; the constraints are derived from them on demand) while the packed word store
+# and the validator are loaded once and shared read-only by all the sessions. The protocol is line based:
+#   NEW              -> OK <session number>           start a new game with a random secret word
+#   GUESS <word>     -> OK <pattern> <guesses> <status>  where the pattern has one digit per letter
+#                                                     (0 gray, 1 yellow, 2 green) and the status is
+#                                                     PLAYING, WON or LOST
+#                    -> ERR <message>                 for a rejected guess
+#   STATE            -> OK <guesses> <status>
+#   QUIT             -> BYE
+# The load generator opens many concurrent sessions against a running server and reports the p50/p99 guess latency
+# and the number of sessions per second.
+# Usage: python server.py serve [--host 127.0.0.1] [--port 8765] [--length 5]
+#        python server.py loadgen [--host 127.0.0.1] [--port 8765] [--length 5] [--sessions N] [--concurrency N]
+
+
+import argparse
+import asyncio
+from random import Random
+from time import perf_counter
+
+from wordle import WordCache, WordValidator, GameSession, percentile
+
+MAX_GUESSES = 6
+
+
+class Session:
+    __slots__ = ("number", "game")
+
+    def __init__(self, number: [int], game: [GameSession]):
+        """
+        Initializes the state of one connection's game.
+        :param number: the number of the session on the server
+        :param game: the game, played over the shared word store
+        """
+        self.number = number
+        self.game = game
+
+
+class GameServer:
+    def __init__(self, words_list: [list], word_length: [int], seed: [int] = None):
+        """
+        Initializes a GameServer object, which hosts many concurrent sessions over one shared word store.
+        :param words_list: the shared, read-only list (or WordStore) of accepted words
+        :param word_length: the number of letters of every word
+        :param seed: the seed used to pick the secret words, for reproducible runs
+        """
+        self.words_list = words_list
+        self.word_length = word_length
+        self.validator = WordValidator(words_list, word_length)
+        self.rng = Random(seed)
+        self.sessions_started = 0
+        self.active_sessions = 0
+
+    def new_session(self) -> Session:
+        """
+        Starts a new game with a random secret word.
+        :return: the state of the new game
+        """
+        self.sessions_started += 1
+        return Session(self.sessions_started, GameSession(self.words_list, validator=self.validator,
+                                                          max_guesses=MAX_GUESSES, rng=self.rng))
+
+    def guess(self, session: [Session], guess_word: [str]) -> str:
+        """
+        Scores a guess of a session and updates its state.
+        :param session: the state of the game
+        :param guess_word: the word guessed by the player
+        :return: the response line
+        """
+        game = session.game
+        if game.status != "PLAYING":
+            return "ERR the game is over, send NEW to play again"
+        error, _ = game.submit_guess(guess_word)
+        if error is not None:
+            return "ERR " + error
+
+        code = game.guesses[-1][1]
+        digits = "".join(str(code // 3 ** i % 3) for i in range(self.word_length))
+        return "OK " + digits + " " + str(len(game.guesses)) + " " + game.status
+
+    def respond(self, session: [Session], line: [str]) -> tuple:
+        """
+        Executes one command of the protocol.
+        :param session: the state of the game of the connection, or None before the first NEW
+        :param line: the command line sent by the client
+        :return: a tuple of the (possibly new) session and the response line, or None for the response to close
+        """
+        if not line.isascii():
+            return session, "ERR commands must be ASCII"
+        command, _, argument = line.strip().partition(" ")
+        command = command.upper()
+
+        if command == "NEW":
+            session = self.new_session()
+            return session, "OK " + str(session.number)
+        elif command == "QUIT":
+            return session, None
+        elif session is None:
+            return session, "ERR send NEW to start a game"
+        elif command == "GUESS":
+            return session, self.guess(session, argument.strip())
+        elif command == "STATE":
+            return session, "OK " + str(len(session.game.guesses)) + " " + session.game.status
+        return session, "ERR unknown command " + command
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """
+        Serves the commands of one connection until it sends QUIT or disconnects.
+        :param reader: the stream of the client's commands
+        :param writer: the stream of the responses
+        """
+        self.active_sessions += 1
+        session = None
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:  # the line is longer than the limit of the stream
+                    writer.write(b"ERR line too long\n")
+                    break
+                if not line:
+                    break
+                session, response = self.respond(session, line.decode('ascii', errors='replace'))
+                if response is None:
+                    writer.write(b"BYE\n")
+                    break
+                writer.write(response.encode('ascii', errors='replace') + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self.active_sessions -= 1
+            writer.close()
+
+    async def serve(self, host: [str], port: [int]):
+        """
+        Accepts connections until the process is stopped.
+        :param host: the address to listen on
+        :param port: the TCP port to listen on
+        """
+        server = await asyncio.start_server(self.handle, host, port, backlog=4096)
+        print("Wordle server listening on " + host + ":" + str(port) + " with " + str(len(self.words_list))
+              + " words")
+        async with server:
+            await server.serve_forever()
+
+
+async def play_sessions(host: [str], port: [int], words_list: [list], games: [int], rng: [Random],
+                        latencies: [list]) -> int:
+    """
+    Plays games over one connection, guessing random accepted words, and records the latency of every guess.
+    :param host: the address of the server
+    :param port: the TCP port of the server
+    :param words_list: the accepted words to guess from
+    :param games: the number of games to play
+    :param rng: the random number generator of the guesses
+    :param latencies: the list the guess latencies (in seconds) are appended to
+    :return: the number of games played
+    """
+    reader, writer = await asyncio.open_connection(host, port)
+    for _ in range(games):
+        writer.write(b"NEW\n")
+        await reader.readline()
+        status = "PLAYING"
+        while status == "PLAYING":
+            start = perf_counter()
+            writer.write(b"GUESS " + rng.choice(words_list).encode('ascii') + b"\n")
+            response = (await reader.readline()).decode('ascii').split()
+            latencies.append(perf_counter() - start)
+            if response[0] != "OK":
+                raise RuntimeError("Unexpected response: " + " ".join(response))
+            status = response[3]
+    writer.write(b"QUIT\n")
+    await reader.readline()
+    writer.close()
+
+    return games
+
+
+async def generate_load(host: [str], port: [int], words_list: [list], sessions: [int], concurrency: [int],
+                        seed: [int] = 0) -> dict:
+    """
+    Plays the given number of sessions against a running server, over a number of concurrent connections.
+    :param host: the address of the server
+    :param port: the TCP port of the server
+    :param words_list: the accepted words to guess from
+    :param sessions: the total number of games to play
+    :param concurrency: the number of connections open at the same time
+    :param seed: the seed of the guesses
+    :return: a dictionary with the guess latency percentiles and the sessions per second
+    """
+    latencies = []
+    concurrency = max(1, min(concurrency, sessions))
+    shares = [sessions // concurrency + (1 if i < sessions % concurrency else 0) for i in range(concurrency)]
+
+    start = perf_counter()
+    played = await asyncio.gather(*(play_sessions(host, port, words_list, share, Random(seed * 100003 + i), latencies)
+                                    for i, share in enumerate(shares)))
+    elapsed = perf_counter() - start
+    latencies.sort()
+
+    return {
+        "sessions": sum(played),
+        "guesses": len(latencies),
+        "p50_ms": percentile(latencies, 0.50) * 1e3,
+        "p99_ms": percentile(latencies, 0.99) * 1e3,
+        "sessions_per_second": sum(played) / elapsed,
+        "guesses_per_second": len(latencies) / elapsed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve Wordle games over TCP, or generate load against a server.")
+    parser.add_argument("command", choices=("serve", "loadgen"))
+    parser.add_argument("--words", default="wordles.txt", help="path to the word list")
+    parser.add_argument("--length", type=int, default=5, choices=range(4, 13), metavar="{4..12}",
+                        help="number of letters of the words")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--seed", type=int, default=None, help="seed of the secret words (serve) or guesses (loadgen)")
+    parser.add_argument("--sessions", type=int, default=10000, help="games to play (loadgen)")
+    parser.add_argument("--concurrency", type=int, default=1000, help="concurrent connections (loadgen)")
+    args = parser.parse_args()
+
+    word_length = args.length
+    words_list = WordCache(args.words, word_length).get().store
+
+    if args.command == "serve":
+        try:
+            asyncio.run(GameServer(words_list, word_length, args.seed).serve(args.host, args.port))
+        except KeyboardInterrupt:
+            print("Bye!")
+    else:
+        results = asyncio.run(generate_load(args.host, args.port, words_list, args.sessions, args.concurrency,
+                                            args.seed or 0))
+        print("Sessions: " + str(results["sessions"]) + ", guesses: " + str(results["guesses"]))
+        print("Guess latency p50: " + format(results["p50_ms"], ".3f") + " ms, p99: "
+              + format(results["p99_ms"], ".3f") + " ms")
+        print("Sessions/second: " + format(results["sessions_per_second"], ".1f") + ", guesses/second: "
+              + format(results["guesses_per_second"], ".1f"))
+
+
+if __name__ == '__main__':
+    main()
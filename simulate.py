@@ -0,0 +1,198 @@
+# simulate.py
+
+# Description: Headless batch mode for the autoplay solver of wordle.py. Every word of the word list is used once as
+# the secret word, the games are spread over a pool of worker processes, and the results are summarised as a
+# histogram of the number of guesses, the mean, the failure rate and the number of games per second.
+# Usage: python simulate.py [--words wordles.txt] [--length 5] [--workers N] [--chunk-size N] [--seed N] [--limit N]
+#                          [--strategy random|frequency|entropy|tree]
+#                          [--cache-mb N]
+
+
+import argparse
+import json
+import os
+from time import perf_counter
+from concurrent.futures import ProcessPoolExecutor
+from random import Random
+from typing import Optional
+
+from wordle import FileHandler, AutoplayMode, CandidateCache, FeedbackEngine, DecisionTree
+
+MAX_GUESSES = 6  # a game which needs more guesses than the official limit counts as a failure
+
+_autoplay = None  # the solver of the current worker process
+
+
+def init_worker(words_list: [list], strategy: [str] = "random", cache_bytes: [int] = 64 * 1024 * 1024):
+    """
+    Initializes a worker process with its own solver, so that the word list and its index are built once per process.
+    :param words_list: the list of words to play with
+    :param strategy: the autoplay strategy, one of AutoplayMode.STRATEGIES
+    :param cache_bytes: the memory cap of the worker's CandidateCache, in bytes
+    """
+    global _autoplay
+    _autoplay = AutoplayMode(words_list, strategy, cache=CandidateCache(cache_bytes))
+
+
+def prepare_caches(words_list: [list], strategy: [str]):
+    """
+    Builds the files the strategy reads from CACHE_DIR (the pattern matrix and opening guess of "entropy" and "tree",
+    and the decision tree of "tree") once in this process, so that the workers map them instead of each building
+    its own copy on a cold cache. Lists too large for the pattern matrix only get the opening guess.
+    :param words_list: the list of words to play with
+    :param strategy: the autoplay strategy, one of AutoplayMode.STRATEGIES
+    """
+    if strategy not in ("entropy", "tree"):
+        return
+    engine = FeedbackEngine(words_list)
+    engine.use_matrix()
+    engine.best_opening()
+    if strategy == "tree" and DecisionTree.load(words_list) is None:
+        DecisionTree.build(engine).save()
+
+
+def game_rng(seed: [int], secret_id: [int]) -> Random:
+    """
+    Returns the random number generator of one game. It only depends on the seed and the secret word, so that the
+    results do not change with the number of workers or the chunk size.
+    :param seed: the seed of the whole batch
+    :param secret_id: the index of the secret word in the word list
+    :return: a seeded random number generator
+    """
+    return Random(seed * 1000003 + secret_id)
+
+
+def play_chunk(secret_ids: [list], seed: [int]) -> tuple:
+    """
+    Plays one game for every given secret word in the current worker process.
+    :param secret_ids: the indices of the secret words in the word list
+    :param seed: the seed of the whole batch
+    :return: a tuple of the list of the number of guesses of every game (0 for the games where no suitable word was
+        left) and the hits, misses and evictions of the worker's candidate cache during the chunk
+    """
+    before = _autoplay.cache.stats()
+    results = []
+    for secret_id in secret_ids:
+        secret = _autoplay.words_list[secret_id]
+        num_of_guesses = 0
+        guess = None
+        for num_of_guesses, (guess, result) in enumerate(_autoplay.solve(secret, game_rng(seed, secret_id)), 1):
+            pass
+        results.append(num_of_guesses if guess == secret else 0)
+
+    after = _autoplay.cache.stats()
+    return results, tuple(after[counter] - before[counter] for counter in ("hits", "misses", "evictions"))
+
+
+def run_batch(words_list: [list], workers: Optional[int] = None, chunk_size: [int] = 64, seed: [int] = 0,
+              limit: Optional[int] = None, strategy: [str] = "random", cache_bytes: [int] = 64 * 1024 * 1024) -> dict:
+    """
+    Solves every word of the list (or the first limit words) as the secret word and collects the statistics.
+    :param words_list: the list of words, used both as the dictionary and as the secret words
+    :param workers: the number of worker processes, by default one per CPU; 1 plays the games in this process
+    :param chunk_size: the number of games sent to a worker at a time
+    :param seed: the seed which makes the solver's random choices reproducible
+    :param limit: the number of secret words to play, by default the whole list
+    :param strategy: the autoplay strategy, one of AutoplayMode.STRATEGIES
+    :param cache_bytes: the memory cap of the candidate cache of every worker, in bytes
+    :return: a dictionary with the histogram, mean, failure rate, games per second and candidate cache counters
+    """
+    secret_ids = list(range(len(words_list) if limit is None else min(limit, len(words_list))))
+    chunks = [secret_ids[i:i + chunk_size] for i in range(0, len(secret_ids), chunk_size)]
+    workers = workers or os.cpu_count() or 1
+    prepare_caches(words_list, strategy)
+
+    start = perf_counter()
+    if workers == 1:
+        init_worker(words_list, strategy, cache_bytes)
+        chunk_results = [play_chunk(chunk, seed) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                                 initargs=(words_list, strategy, cache_bytes)) as executor:
+            chunk_results = list(executor.map(play_chunk, chunks, [seed] * len(chunks)))
+    elapsed = perf_counter() - start
+
+    guesses = [count for results, _ in chunk_results for count in results]
+    stats = summarise(guesses, elapsed)
+    stats["cache"] = dict(zip(("hits", "misses", "evictions"),
+                              (sum(counters[i] for _, counters in chunk_results) for i in range(3))))
+
+    return stats
+
+
+def summarise(guesses: [list], elapsed: [float]) -> dict:
+    """
+    Summarises the number of guesses of a batch of games.
+    :param guesses: the number of guesses of every game, 0 for the games which were not solved
+    :param elapsed: the wall-clock time of the batch in seconds
+    :return: a dictionary with the histogram, mean, failure rate and games per second
+    """
+    histogram = {}
+    for count in guesses:
+        histogram[count] = histogram.get(count, 0) + 1
+
+    solved = [count for count in guesses if count]
+    failures = sum(1 for count in guesses if not count or count > MAX_GUESSES)
+
+    return {
+        "games": len(guesses),
+        "histogram": dict(sorted(histogram.items())),
+        "mean": sum(solved) / len(solved) if solved else None,
+        "failure_rate": failures / len(guesses) if guesses else 0.0,
+        "seconds": elapsed,
+        "games_per_second": len(guesses) / elapsed if elapsed else None,
+    }
+
+
+def format_report(stats: [dict]) -> str:
+    """
+    Formats the statistics returned by run_batch as a text report.
+    :param stats: the statistics of a batch
+    :return: the report
+    """
+    lines = ["Games: " + str(stats["games"])]
+    width = max(stats["histogram"].values(), default=0)
+    for count, games in stats["histogram"].items():
+        label = str(count) if count else "x"  # 'x' stands for the games where no suitable word was left
+        lines.append(label.rjust(3) + " | " + "#" * round(40 * games / width) + " " + str(games))
+    mean = "n/a" if stats["mean"] is None else format(stats["mean"], ".3f")
+    lines.append("Mean guesses: " + mean)
+    lines.append("Failure rate: " + format(100 * stats["failure_rate"], ".2f") + "% (more than "
+                 + str(MAX_GUESSES) + " guesses or unsolved)")
+    lines.append("Games/second: " + format(stats["games_per_second"] or 0, ".1f"))
+    if "cache" in stats:
+        cache = stats["cache"]
+        lookups = cache["hits"] + cache["misses"]
+        lines.append("Candidate cache: " + str(cache["hits"]) + " hits, " + str(cache["misses"]) + " misses ("
+                     + format(100 * cache["hits"] / lookups if lookups else 0, ".1f") + "% hit rate), "
+                     + str(cache["evictions"]) + " evictions")
+
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Solve every word of the word list with the autoplay solver.")
+    parser.add_argument("--words", default="wordles.txt", help="path to the word list")
+    parser.add_argument("--length", type=int, default=5, choices=range(4, 13), metavar="{4..12}",
+                        help="number of letters of the words")
+    parser.add_argument("--workers", type=int, default=None, help="number of worker processes (default: CPU count)")
+    parser.add_argument("--chunk-size", type=int, default=64, help="games per unit of work sent to a worker")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the solver's random choices")
+    parser.add_argument("--limit", type=int, default=None, help="only play the first LIMIT secret words")
+    parser.add_argument("--strategy", choices=AutoplayMode.STRATEGIES, default="random", help="autoplay strategy")
+    parser.add_argument("--cache-mb", type=float, default=64, help="memory cap of each worker's candidate cache (MB)")
+    parser.add_argument("--json", action="store_true", help="print the statistics as JSON")
+    args = parser.parse_args()
+
+    words_list = FileHandler(args.words, []).get_word_store(args.length)
+    stats = run_batch(words_list, args.workers, args.chunk_size, args.seed, args.limit, args.strategy,
+                      int(args.cache_mb * 1024 * 1024))
+
+    if args.json:
+        print(json.dumps(stats, indent=2))
+    else:
+        print(format_report(stats))
+
+
+if __name__ == '__main__':
+    main()
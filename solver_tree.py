@@ -0,0 +1,102 @@
+# solver_tree.py
+
+# Description: Offline builder of the decision-tree solver of wordle.py. The tree maps every feedback pattern of
+# check() to the next guess, down to every secret word, so the "tree" autoplay strategy only makes one lookup per
+# turn. The subtrees under the first guess are built in parallel worker processes, which share the memory-mapped
+# pattern matrix, and joined into one flat node/edge array stored in .wordle_cache/. The tool then reports the average
+# and worst-case number of guesses of the tree.
+# Usage: python solver_tree.py [--words wordles.txt] [--length 5] [--workers N]
+
+
+import argparse
+import os
+from time import perf_counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+import numpy as np
+
+from wordle import WordCache, FeedbackEngine, DecisionTree
+
+_engine = None  # the feedback engine of the current worker process
+
+
+def init_worker(words_path: [str], word_length: [int]):
+    """
+    Initializes a worker process with the feedback engine, mapping the word cache and the pattern matrix cached on
+    disk. The worker reopens the caches from their paths, as the memory-mapped word store cannot be pickled to it.
+    :param words_path: the path to the word list the tree is built for
+    :param word_length: the number of letters of the words
+    """
+    global _engine
+    _engine = FeedbackEngine(WordCache(words_path, word_length).get().store)
+    _engine.get_matrix()
+
+
+def build_first_level(code: [int], candidate_ids) -> tuple:
+    """
+    Builds the subtree under one pattern of the first guess, in a worker process.
+    :param code: the pattern code of the first guess leading to the subtree
+    :param candidate_ids: the ids of the secrets which give that pattern
+    :return: a tuple of the pattern code and the node and edge arrays of the subtree
+    """
+    nodes, edges = DecisionTree.build_subtree(_engine, candidate_ids)
+    return code, nodes, edges
+
+
+def build_tree(words_path: [str], word_length: [int], workers: Optional[int] = None) -> DecisionTree:
+    """
+    Builds the decision tree of a word list, spreading the subtrees of the first guess over worker processes.
+    :param words_path: the path to the word list, whose words are both the guesses and the secret words
+    :param word_length: the number of letters of the words
+    :param workers: the number of worker processes, by default one per CPU; 1 builds in this process
+    :return: the tree
+    """
+    words_list = WordCache(words_path, word_length).get().store
+    engine = FeedbackEngine(words_list)
+    engine.get_matrix()  # build and cache the matrix once, before the workers map it
+    root_guess = engine.best_opening()
+    candidates = np.arange(len(words_list))
+    codes = engine.patterns(root_guess, candidates)
+    solved = 3 ** engine.word_length - 1
+
+    # The largest subtrees go first, so that no worker is left with a long one at the end
+    groups = [(int(code), candidates[codes == code]) for code in np.unique(codes) if code != solved]
+    groups.sort(key=lambda group: len(group[1]), reverse=True)
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        subtrees = [(code,) + DecisionTree.build_subtree(engine, ids) for code, ids in groups]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                                 initargs=(words_path, word_length)) as executor:
+            subtrees = list(executor.map(build_first_level, *zip(*groups)))
+
+    return DecisionTree.from_subtrees(words_list, root_guess, subtrees)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the decision-tree solver of the word list.")
+    parser.add_argument("--words", default="wordles.txt", help="path to the word list")
+    parser.add_argument("--length", type=int, default=5, choices=range(4, 13), metavar="{4..12}",
+                        help="number of letters of the words")
+    parser.add_argument("--workers", type=int, default=None, help="number of worker processes (default: CPU count)")
+    args = parser.parse_args()
+
+    start = perf_counter()
+    tree = build_tree(args.words, args.length, args.workers)
+    words_list = tree.words_list
+    path = tree.save()
+    print("Built a tree of " + str(len(tree.nodes)) + " nodes in " + format(perf_counter() - start, ".1f")
+          + " s, saved to " + path)
+
+    depths = tree.depths()
+    solved = depths[depths > 0]
+    print("Secrets solved: " + str(len(solved)) + "/" + str(len(words_list)))
+    print("Average guesses: " + format(float(solved.mean()), ".4f") + ", worst case: " + str(int(solved.max())))
+    for count, games in zip(*np.unique(solved, return_counts=True)):
+        print(str(int(count)).rjust(3) + " guesses: " + str(int(games)))
+
+
+if __name__ == '__main__':
+    main()
@@ -21,11 +21,72 @@
 # The nested-if structure is adapted from the lecture slides week 1, slide 61.
 
 
-from random import choice
-from time import sleep
+import os
+import sys
+import json
+import argparse
+import cProfile
+import mmap
+import heapq
+import struct
+import hashlib
+from array import array
+from collections import OrderedDict
+from contextlib import nullcontext
+from itertools import combinations
+from random import choice, Random
+from time import sleep, perf_counter
 from typing import Optional, Union, List
 from abc import ABC, abstractmethod
 
+try:
+    import numpy as np
+except ImportError:  # NumPy is only needed for the precomputed pattern matrix
+    np = None
+
+
+# The feedback colours in the order of their base-3 digit value
+GRAY, YELLOW, GREEN = 0, 1, 2
+COLOURS = ("gray", "yellow", "green")
+# The weight of the digit of every position in a pattern code, and the value of a green letter at that position
+PATTERN_WEIGHTS = tuple(3 ** i for i in range(32))
+GREEN_WEIGHTS = tuple(GREEN * weight for weight in PATTERN_WEIGHTS)
+# Up to this word length, decode_pattern looks the colours of every pattern code up in a table
+DECODE_TABLE_MAX = 8
+# Bump whenever the scoring rules change, so that cached pattern matrices are rebuilt
+PATTERN_VERSION = 2
+# Above this many (guess, pattern) buckets per block, the entropies count only the buckets which occur (long words)
+DENSE_BUCKETS = 1 << 22
+# Above this many words, the N x N pattern matrix is not precomputed and patterns are scored on the fly
+MATRIX_MAX_WORDS = 20000
+# The number of words sampled to pick the opening guess of a list too large for the pattern matrix
+OPENING_SAMPLE = 2048
+# The most candidates and the most other words the multi-board solver scores as its guess per turn, with the pattern
+# matrix and on the fly, and the most candidates per board it scores them against
+BOARD_POOL = 1024
+BOARD_POOL_LARGE = 256
+BOARD_SAMPLE = 512
+# Directory holding the derived data (pattern matrices, ...) which is expensive to rebuild
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".wordle_cache")
+
+
+class WordListError(Exception):
+    """
+    Raised when a word list cannot be read.
+    """
+
+
+class WordListNotFoundError(WordListError):
+    """
+    Raised when the file of a word list does not exist.
+    """
+
+
+class WordListPermissionError(WordListError):
+    """
+    Raised when the file of a word list cannot be opened for reading.
+    """
+
 
 class FileHandler:
     def __init__(self, file_with_words_path: [str], words_list: [list]):
@@ -41,6 +102,7 @@ class FileHandler:
         """
         Reads words from the file and returns them as a list.
         :return: a list containing the words read from the file
+        :raises WordListError: if the file cannot be read, as stream_words
         """
         try:
             # Open the file in read mode
@@ -48,70 +110,496 @@ class FileHandler:
                 # Read each line in the file, remove leading and trailing whitespace and store the word
                 self.words_list = [line.strip() for line in file]
         except FileNotFoundError:
-            print("Error: The file " + self.file_with_words_path + " was not found.")
-            quit()
+            raise WordListNotFoundError("The file " + self.file_with_words_path + " was not found.") from None
         except PermissionError:
-            print("Error: Permission denied to read the file " + self.file_with_words_path + ".")
-            quit()
-        except Exception as e:
-            print("An unexpected error occurred while reading the file: " + str(e))
-            quit()
+            raise WordListPermissionError("Permission denied to read the file " + self.file_with_words_path + ".") \
+                from None
+        except (OSError, UnicodeDecodeError) as e:
+            raise WordListError("An unexpected error occurred while reading the file: " + str(e)) from e
 
         return self.words_list
 
+    def stream_words(self, word_length: [int], chunk_size: [int] = 65536, seen: Optional['WordStore'] = None):
+        """
+        Reads the file line by line and yields its words in chunks, so that a dictionary of millions of words never
+        has to be held in memory as text. The words are lower-cased, and only the alphabetic ASCII words of the
+        given length are kept. Duplicates are skipped by looking them up in a WordStore of the words seen so far,
+        which costs a few bytes per distinct word instead of a set of strings.
+        :param word_length: the number of letters of the words to keep
+        :param chunk_size: the maximum number of words per chunk
+        :param seen: the store holding the words already yielded, which the caller may fill with the chunks itself
+            (as get_word_store does); by default an internal store is used
+        :return: a generator of lists of words
+        """
+        fill_seen = seen is None
+        seen = WordStore(word_length) if fill_seen else seen
+        chunk = []
+        in_chunk = set()  # the words of the current chunk, which are not in the seen store yet
+
+        try:
+            with open(self.file_with_words_path, 'r', encoding='utf-8') as file:
+                for line in file:
+                    word = line.strip().lower()
+                    if len(word) != word_length or not word.isalpha() or not word.isascii():
+                        continue
+                    if word in in_chunk or word in seen:
+                        continue
+                    chunk.append(word)
+                    in_chunk.add(word)
+
+                    if len(chunk) >= chunk_size:
+                        if fill_seen:
+                            seen.extend(chunk)
+                        yield chunk
+                        chunk, in_chunk = [], set()
+        except FileNotFoundError:
+            raise WordListNotFoundError("The file " + self.file_with_words_path + " was not found.") from None
+        except PermissionError:
+            raise WordListPermissionError("Permission denied to read the file " + self.file_with_words_path + ".") \
+                from None
+        except (OSError, UnicodeDecodeError) as e:
+            raise WordListError("An unexpected error occurred while reading the file: " + str(e)) from e
+
+        if chunk:
+            yield chunk
+
+    def get_word_store(self, word_length: [int], chunk_size: [int] = 65536) -> 'WordStore':
+        """
+        Streams words from the file and packs them into a WordStore.
+        :param word_length: the number of letters of every word
+        :param chunk_size: the number of words read per chunk
+        :return: a WordStore containing the words read from the file
+        """
+        store = WordStore(word_length)
+        for chunk in self.stream_words(word_length, chunk_size, seen=store):
+            store.extend(chunk)
+
+        return store
+
+    def get_indexed_words(self, word_length: [int], chunk_size: [int] = 65536) -> tuple:
+        """
+        Streams words from the file into a WordStore, a FrequencySorter and a ConstraintIndex chunk by chunk, so that
+        only one chunk of text is held in memory next to the indexes.
+        :param word_length: the number of letters of every word
+        :param chunk_size: the number of words read per chunk
+        :return: a tuple of the WordStore, the FrequencySorter and the ConstraintIndex of the words
+        """
+        store = WordStore(word_length)
+        sorter = FrequencySorter(store)
+        index = ConstraintIndex(store)
+        for chunk in self.stream_words(word_length, chunk_size, seen=store):
+            store.extend(chunk)
+            sorter.add_words(chunk)
+            index.add_words(chunk)
+
+        return store, sorter, index
+
+
+class WordStore:
+    # Multiplier of the Fibonacci hashing of the hash index
+    GOLDEN = 0x9E3779B97F4A7C15
+    # Largest prime below 2 ** 64, used to fold records longer than 8 bytes into 64 bits
+    FOLD = 0xFFFFFFFFFFFFFFC5
+    EMPTY = -1
+
+    def __init__(self, word_length: [int], buffer=None, table=None, count: [int] = 0):
+        """
+        Initializes a WordStore object, which packs every word into one contiguous buffer of fixed-width ASCII records.
+        The id of a word is the index of its record. A hash index (an open-addressing table of word ids) gives O(1)
+        membership tests and id lookups without keeping a Python string per word.
+        The store behaves like a read-only list of words, so it can be shared by every component instead of a list.
+        :param word_length: the number of letters, i.e. bytes, of every word
+        :param buffer: an existing buffer of packed records, by default an empty bytearray
+        :param table: the hash index matching the buffer, rebuilt when it is not given
+        :param count: the number of records in the given buffer
+        """
+        self.word_length = word_length
+        self.buffer = bytearray() if buffer is None else buffer
+        self.count = count
+        self.table = table
+        self.shift = 0
+        if self.table is None:
+            self.rehash(self.count)
+        else:
+            self.shift = 64 - (len(self.table).bit_length() - 1)
+
+    @classmethod
+    def from_words(cls, words, word_length: [int]) -> 'WordStore':
+        """
+        Builds a store from an iterable of words. Duplicated words are stored once.
+        :param words: the words to store
+        :param word_length: the number of letters of every word
+        :return: a new WordStore object
+        """
+        store = cls(word_length)
+        store.extend(words)
+
+        return store
+
+    def rehash(self, capacity: [int]):
+        """
+        Rebuilds the hash index with room for at least the given number of words, at a load factor of at most 1/2.
+        :param capacity: the number of words the index must hold
+        """
+        size = 8
+        while size < 2 * capacity:
+            size *= 2
+        self.table = array('i', [self.EMPTY]) * size
+        self.shift = 64 - (size.bit_length() - 1)
+
+        for word_id in range(self.count):
+            start = word_id * self.word_length
+            slot = self.slot(self.buffer[start:start + self.word_length])
+            self.table[slot] = word_id
+
+    def hash(self, record) -> int:
+        """
+        Hashes a record into a slot number of the hash index. The hash does not depend on the Python process, so the
+        index can be stored on disk.
+        :param record: the ASCII bytes of a word
+        :return: the first slot to probe
+        """
+        key = int.from_bytes(record, 'little') % self.FOLD
+        return ((key * self.GOLDEN) & 0xFFFFFFFFFFFFFFFF) >> self.shift
+
+    def slot(self, record) -> int:
+        """
+        Returns the slot of the hash index holding the given record, or the empty slot where it would be inserted.
+        :param record: the ASCII bytes of a word
+        :return: a slot number
+        """
+        table, buffer, width = self.table, self.buffer, self.word_length
+        mask = len(table) - 1
+        slot = self.hash(record)
+
+        # Linear probing until the record or an empty slot is found
+        while True:
+            word_id = table[slot]
+            if word_id == self.EMPTY or buffer[word_id * width:(word_id + 1) * width] == record:
+                return slot
+            slot = (slot + 1) & mask
+
+    def encode(self, word: [str]) -> Optional[bytes]:
+        """
+        Returns the record of a word, or None if the word cannot be stored (wrong length or not ASCII).
+        :param word: the word to encode
+        :return: the ASCII bytes of the word
+        """
+        if len(word) != self.word_length or not word.isascii():
+            return None
+
+        return word.encode('ascii')
+
+    def add(self, word: [str]) -> int:
+        """
+        Adds a word to the store, unless it is already there.
+        :param word: the word to add
+        :return: the id of the word
+        """
+        record = self.encode(word)
+        if record is None:
+            raise ValueError(word + " is not an ASCII word of " + str(self.word_length) + " letters")
+
+        slot = self.slot(record)
+        if self.table[slot] != self.EMPTY:
+            return self.table[slot]
+
+        if not isinstance(self.buffer, bytearray):
+            self.make_writable()
+        word_id = self.count
+        self.buffer += record
+        self.table[slot] = word_id
+        self.count += 1
+        if 2 * self.count > len(self.table):
+            self.rehash(self.count)
+
+        return word_id
+
+    def make_writable(self):
+        """
+        Copies the records and the hash index into memory the store owns, before the first word is added to a store
+        over read-only buffers (e.g. the memory-mapped views of WordCache.load).
+        """
+        self.buffer = bytearray(self.buffer[:self.count * self.word_length])
+        self.table = array('i', self.table)
+
+    def extend(self, words):
+        """
+        Adds every word of an iterable to the store.
+        :param words: the words to add
+        """
+        for word in words:
+            self.add(word)
+
+    def id_of(self, word: [str]) -> int:
+        """
+        Looks a word up in the hash index.
+        :param word: the word to look for
+        :return: the id of the word, or -1 if it is not in the store
+        """
+        record = self.encode(word)
+        if record is None:
+            return self.EMPTY
+
+        return self.table[self.slot(record)]
+
+    def index(self, word: [str]) -> int:
+        """
+        Returns the id of a word, like list.index.
+        :param word: the word to look for
+        :return: the id of the word
+        """
+        word_id = self.id_of(word)
+        if word_id == self.EMPTY:
+            raise ValueError(str(word) + " is not in the word store")
+
+        return word_id
+
+    def as_array(self):
+        """
+        Returns a zero-copy (N, word_length) uint8 NumPy view of the records.
+        :return: the ASCII codes of the letters of every word
+        """
+        return np.frombuffer(self.buffer, dtype=np.uint8, count=self.count * self.word_length).reshape(
+            self.count, self.word_length)
+
+    def nbytes(self) -> int:
+        """
+        Returns the memory used by the records and the hash index.
+        :return: a number of bytes
+        """
+        return self.count * self.word_length + len(self.table) * self.table.itemsize
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, word_id):
+        if isinstance(word_id, slice):
+            return [self[i] for i in range(*word_id.indices(self.count))]
+        if word_id < 0:
+            word_id += self.count
+        if not 0 <= word_id < self.count:
+            raise IndexError("word id out of range")
+        start = word_id * self.word_length
+
+        return str(self.buffer[start:start + self.word_length], 'ascii')
+
+    def __iter__(self):
+        width = self.word_length
+        for start in range(0, self.count * width, width):
+            yield str(self.buffer[start:start + width], 'ascii')
+
+    def __contains__(self, word) -> bool:
+        return isinstance(word, str) and self.id_of(word) != self.EMPTY
+
 
 class FrequencySorter:
-    def __init__(self, words: [list]):
+    ALPHABET = "abcdefghijklmnopqrstuvwxyz"
+
+    def __init__(self, words: [list], counts: Optional[list] = None, positional_counts: Optional[list] = None):
         """
         Initializes a FrequencySorter object with the provided list of words.
+        The letter counts are kept up to date as words are added to or removed from the working set, instead of
+        being recounted on every call.
         :param words: a list of words to be used for frequency sorting
+        :param counts: the precomputed counts of the letters of the words, e.g. loaded from a WordCache
+        :param positional_counts: the precomputed counts of the letters at each index, given together with counts
         """
         self.words = words
         self.frequencies = {}
+        if counts is None:
+            self.counts = [0] * len(self.ALPHABET)  # one slot per letter 'a' to 'z'
+            self.positional_counts = []  # one list of 26 counts per index
+            self.add_words(words)
+        else:
+            self.counts = list(counts)
+            self.positional_counts = [list(position) for position in positional_counts]
+
+    def update_counts(self, words: [list], step: [int]):
+        """
+        Adds step (1 or -1) to the counts of every letter of the given words.
+        :param words: the words to count
+        :param step: 1 when the words are added to the working set, -1 when they are removed
+        """
+        counts = self.counts
+        for word in words:
+            for i, char in enumerate(word):
+                letter = ord(char) - 97
+                if 0 <= letter < 26:  # Ensure the character is a letter
+                    if i == len(self.positional_counts):
+                        self.positional_counts.append([0] * len(self.ALPHABET))
+                    counts[letter] += step
+                    self.positional_counts[i][letter] += step
+
+    def add_words(self, words: [list]):
+        """
+        Adds words to the working set, updating the letter counts in place.
+        :param words: the words to add
+        """
+        self.update_counts(words, 1)
+
+    def remove_words(self, words: [list]):
+        """
+        Removes words from the working set, e.g. the candidates pruned by autoplay, updating the letter counts in place.
+        :param words: the words to remove, which must have been counted before
+        """
+        self.update_counts(words, -1)
+
+    def reset(self, words: [list]):
+        """
+        Replaces the working set with the given words and counts them from scratch.
+        :param words: the new working set
+        """
+        self.counts = [0] * len(self.ALPHABET)
+        self.positional_counts = []
+        self.add_words(words)
+
+    def copy(self) -> 'FrequencySorter':
+        """
+        Returns an independent copy of the counts, to prune without recounting the whole list.
+        :return: a new FrequencySorter object
+        """
+        sorter = FrequencySorter([])
+        sorter.words = self.words
+        sorter.counts = list(self.counts)
+        sorter.positional_counts = [list(counts) for counts in self.positional_counts]
+
+        return sorter
+
+    def positional_frequencies(self, index: [int]) -> dict:
+        """
+        Returns the frequencies of the letters found at the given index of the words.
+        :param index: a 0-based index into the words
+        :return: a dictionary of letters to their counts at that index
+        """
+        counts = self.positional_counts[index] if index < len(self.positional_counts) else []
+        return {self.ALPHABET[letter]: count for letter, count in enumerate(counts) if count}
+
+    def word_score(self, word: [str]) -> int:
+        """
+        Scores a word by how common its distinct letters are overall and how common each letter is at its index.
+        :param word: the word to score
+        :return: the score, higher for words made of frequent letters at frequent positions
+        """
+        total = 0
+        for i, char in enumerate(word):
+            letter = ord(char) - 97
+            if 0 <= letter < 26:
+                total += self.positional_counts[i][letter]
+        for char in set(word):
+            letter = ord(char) - 97
+            if 0 <= letter < 26:
+                total += self.counts[letter]
+
+        return total
 
     def bucket_sort_desc(self) -> [list]:
         """
-        Performs bucket sort in descending order based on character frequencies.
+        Sorts the letters in descending order based on character frequencies. There are only 26 letters, so the
+        fixed 26-slot count array is sorted directly instead of allocating one bucket per possible frequency.
         :return: a sorted list of characters based on their frequencies
         """
-        max_freq = max(self.frequencies.values())  # Find the maximum frequency
-        buckets = [[] for _ in range(max_freq + 1)]  # Create buckets for each possible frequency
-        sorted_chars = []
-
-        # Distribute characters into buckets based on their frequencies
-        [buckets[max_freq - freq].append(char) for char, freq in self.frequencies.items()]
+        letters = [letter for letter in range(len(self.ALPHABET)) if self.counts[letter] > 0]
+        letters.sort(key=lambda letter: self.counts[letter], reverse=True)
 
-        # Concatenate characters from buckets into a single list
-        [sorted_chars.extend(bucket) for bucket in buckets]
+        return [self.ALPHABET[letter] for letter in letters]
 
-        return sorted_chars
+    def top_letters(self, k: [int]) -> [list]:
+        """
+        Returns the k most frequent letters of the working set, taken from a heap over the 26 counts.
+        :param k: the number of letters to return
+        :return: a list of at most k characters, most frequent first
+        """
+        letters = [letter for letter in range(len(self.ALPHABET)) if self.counts[letter] > 0]
+        return [self.ALPHABET[letter] for letter in heapq.nlargest(k, letters, key=self.counts.__getitem__)]
 
     def sort_frequencies(self, command: [str]) -> Optional[List[str]]:
         """
         Prints the frequencies for each letter 'a' to 'z', as found in the given list of words.
-        :param command: a list of string containing the words to count the letters for
+        :param command: either "print" to print the frequencies or "returntopfive" to return the five top letters
         """
-        self.frequencies = {}
-        # Count the frequencies of each letter in the words
-        for word in self.words:
-            for char in word:
-                if char in self.frequencies:  # Ensure the character is a letter
-                    self.frequencies[char] += 1  # Convert to lowercase and increment frequency
-                else:
-                    self.frequencies[char] = 1
-
         sorted_chars = self.bucket_sort_desc()
+        self.frequencies = {char: self.counts[ord(char) - 97] for char in sorted_chars}
 
         if command == "print":
             [print(char + ": " + str(self.frequencies[char])) for char in sorted_chars]  # Print the frequencies
         elif command == "returntopfive":
-            return sorted_chars[:5]
+            return self.top_letters(5)
+
+
+# Below this many words, converting a list to a NumPy matrix costs more than the pure-Python scan
+VECTORIZE_MIN_WORDS = 64
+
+
+def word_matrix(words: [list]):
+    """
+    Returns the words as an (N, word_length) uint8 NumPy matrix of ASCII codes, without copying for a WordStore.
+    :param words: a list of words or a WordStore
+    :return: the matrix, or None if NumPy is unavailable or the words are not ASCII words of equal length
+    """
+    if np is None or not len(words):
+        return None
+    if isinstance(words, WordStore):
+        return words.as_array()
+
+    word_length = len(words[0])
+    if any(len(word) != word_length for word in words):
+        return None
+    try:
+        encoded = "".join(words).encode('ascii')
+    except UnicodeEncodeError:
+        return None
+
+    return np.frombuffer(encoded, dtype=np.uint8).reshape(len(words), word_length)
+
+
+def letter_mask(matrix, letter: [str]):
+    """
+    Returns which rows of a word matrix contain the given letter.
+    :param matrix: an (N, word_length) matrix of ASCII codes
+    :param letter: the letter to look for
+    :return: a boolean array of N values
+    """
+    code = ord(letter) if len(letter) == 1 else 256
+    if code > 127:  # A letter which cannot be in an ASCII word
+        return np.zeros(len(matrix), dtype=bool)
+
+    return (matrix == code).any(axis=1)
+
+
+def find_ids_with_letters(matrix, letters: [str]):
+    """
+    Vectorized find_words_with_letters: find the rows of a word matrix which contain all the given letters.
+    :param matrix: an (N, word_length) matrix of ASCII codes, as returned by word_matrix
+    :param letters: the list of letters to be matched
+    :return: an array of the matching row indices, in increasing order
+    """
+    mask = np.ones(len(matrix), dtype=bool)
+    for letter in letters:
+        mask &= letter_mask(matrix, letter)
+
+    return np.flatnonzero(mask)
 
 
 def find_words_with_letters(words: [str], letters: [str]) -> [str]:
     """
     Find all words in the given list, which match all the given letters.
     For example for letters ['a', 'd', 'n'] and words list ['and', 'din', 'aid', 'dan'], return ['and', 'dan'].
+    Large lists are checked with NumPy when it is available, and with find_words_with_letters_python otherwise.
+    :param words: the list of words to be checked
+    :param letters: the list of letters to be matched
+    :return: a sublist of words which match the given characters
+    """
+    matrix = word_matrix(words) if len(words) >= VECTORIZE_MIN_WORDS else None
+    if matrix is None:
+        return find_words_with_letters_python(words, letters)
+
+    return [words[word_id] for word_id in find_ids_with_letters(matrix, letters)]
+
+
+def find_words_with_letters_python(words: [str], letters: [str]) -> [str]:
+    """
+    Pure-Python find_words_with_letters, used for short lists or when NumPy is unavailable.
     :param words: the list of words to be checked
     :param letters: the list of letters to be matched
     :return: a sublist of words which match the given characters
@@ -127,6 +615,104 @@ def find_words_with_letters(words: [str], letters: [str]) -> [str]:
     return sublist_words  # send the list back to main program
 
 
+GUESS_LAYOUTS = {}  # guess -> the positions of each of its letters, see letter_layout
+
+
+def letter_layout(check_word: [str]) -> dict:
+    """
+    Returns the positions of every distinct letter of a guess, computed once per guess and then looked up. The table
+    is emptied when it grows past the size of a large dictionary.
+    :param check_word: the guessed word
+    :return: a dictionary mapping every letter of the guess to the tuple of its positions
+    """
+    layout = GUESS_LAYOUTS.get(check_word)
+    if layout is None:
+        positions = {}
+        for position, letter in enumerate(check_word):
+            positions.setdefault(letter, []).append(position)
+        layout = {letter: tuple(indices) for letter, indices in positions.items()}
+        if len(GUESS_LAYOUTS) >= 1 << 18:
+            GUESS_LAYOUTS.clear()
+        GUESS_LAYOUTS[check_word] = layout
+
+    return layout
+
+
+def score(secret: [str], check_word: [str]) -> int:
+    """
+    Given a secret word and a check_word, which must be of equal length, return the feedback encoded as a single
+    base-3 integer. The digit of position i (weight 3 ** i) is 0 for 'gray', 1 for 'yellow' and 2 for 'green',
+    so a 5-letter feedback fits in the range 0..242.
+    A repeated letter of check_word is only yellow as many times as the secret word has it left over after the
+    green ones, from left to right, and gray after that (the official rules).
+    For example for the secret word 'store' and check_word 'raise', it should return 1 + 0 + 0 + 27 + 162 = 190
+    :param secret: a word to be checked against
+    :param check_word: another word of equal length to be checked based on Wordle's rules
+    :return: the feedback pattern code
+    """
+    try:
+        layout = GUESS_LAYOUTS[check_word]
+    except KeyError:
+        layout = letter_layout(check_word)
+    code = 0
+
+    # Only the letters the two words share score anything, the others stay gray (0)
+    for letter in layout.keys() & secret:
+        positions = layout[letter]
+        if len(positions) == 1:
+            position = positions[0]
+            code += GREEN_WEIGHTS[position] if secret[position] == letter else PATTERN_WEIGHTS[position]
+            continue
+
+        # A repeated letter: the greens first, then yellows while the secret has copies of it left
+        left = secret.count(letter)
+        for position in positions:
+            if secret[position] == letter:
+                code += GREEN_WEIGHTS[position]
+                left -= 1
+        for position in positions:
+            if left > 0 and secret[position] != letter:
+                code += PATTERN_WEIGHTS[position]
+                left -= 1
+
+    return code
+
+
+DECODED_PATTERNS = {}  # word length -> the colours of every pattern code, for lengths up to DECODE_TABLE_MAX
+
+
+def decode_pattern(code: [int], word_length: [int]) -> [str]:
+    """
+    Decode a feedback pattern code, as returned by score, back to a list of 'gray', 'yellow' or 'green' values.
+    :param code: the base-3 feedback pattern code
+    :param word_length: the number of letters the pattern refers to
+    :return: a list containing the values 'gray', 'yellow', 'green'
+    """
+    table = DECODED_PATTERNS.get(word_length)
+    if table is None and word_length <= DECODE_TABLE_MAX:
+        table = DECODED_PATTERNS[word_length] = [tuple(decode_digits(code, word_length))
+                                                 for code in range(3 ** word_length)]
+    if table is not None:
+        return list(table[code])
+
+    return decode_digits(code, word_length)
+
+
+def decode_digits(code: [int], word_length: [int]) -> [str]:
+    """
+    Decodes a feedback pattern code digit by digit, see decode_pattern.
+    :param code: the base-3 feedback pattern code
+    :param word_length: the number of letters the pattern refers to
+    :return: a list containing the values 'gray', 'yellow', 'green'
+    """
+    list_wordle = []
+    for _ in range(word_length):
+        code, digit = divmod(code, 3)
+        list_wordle.append(COLOURS[digit])
+
+    return list_wordle
+
+
 def check(secret: [str], check_word: [str]) -> [str]:
     """
     Given a secret word and a check_word, which must be of equal length, return a list of words which
@@ -140,83 +726,1501 @@ def check(secret: [str], check_word: [str]) -> [str]:
     :param check_word: another word of equal length to be checked based on Wordle's rules
     :return: a list containing the values 'gray', 'yellow', 'green'
     """
-    list_wordle = []
+    code = score(secret, check_word)
+    table = DECODED_PATTERNS.get(len(check_word))
+    if table is not None and len(secret) == len(check_word):
+        return list(table[code])
+
+    return decode_pattern(code, min(len(secret), len(check_word)))
+
+
+def word_list_digest(words: [list]) -> str:
+    """
+    Returns a hash of the given words, used to key the files derived from a word list.
+    :param words: the list of words to hash
+    :return: a hexadecimal digest of the words, in order
+    """
+    digest = hashlib.sha1()
+    for word in words:
+        digest.update(word.encode("utf-8") + b"\n")
+
+    return digest.hexdigest()
+
+
+def cache_path(kind: [str], words_list: [list], ext: [str]) -> str:
+    """
+    Returns the path of a file derived from a word list in CACHE_DIR, keyed by PATTERN_VERSION and the words.
+    :param kind: the kind of derived data, e.g. "patterns" or "tree"
+    :param words_list: the list of words the file is derived from
+    :param ext: the extension of the file, with its dot
+    :return: a path inside CACHE_DIR
+    """
+    digest = word_list_digest(words_list)
+    return os.path.join(CACHE_DIR, kind + "-v" + str(PATTERN_VERSION) + "-" + digest[:16] + ext)
+
+
+def atomic_write(path: [str], writer):
+    """
+    Writes a file through a temporary file next to it, which then replaces the file, so that a concurrent reader
+    never reads or maps a partial file. The directory of the file is created if needed.
+    :param path: the path of the file
+    :param writer: a function which writes the content to the temporary file, opened in binary mode
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    temporary_path = path + "." + str(os.getpid()) + ".tmp"
+    with open(temporary_path, 'wb') as file:
+        writer(file)
+    os.replace(temporary_path, path)
+
+
+def pattern_dtype(word_length: [int]):
+    """
+    Returns the smallest unsigned NumPy integer type able to hold every pattern code of the given word length.
+    :param word_length: the number of letters of the words
+    :return: a NumPy dtype
+    """
+    if 3 ** word_length <= 2 ** 8:
+        return np.uint8
+    elif 3 ** word_length <= 2 ** 16:
+        return np.uint16
+    return np.uint32
+
+
+def score_letters(guesses, secrets):
+    """
+    Scores a block of guesses against a block of secrets, given as letter matrices, in a few array operations.
+    :param guesses: a (G, word_length) letter matrix of the guesses
+    :param secrets: an (S, word_length) letter matrix of the secrets
+    :return: a (G, S) uint32 matrix of pattern codes
+    """
+    word_length = guesses.shape[1]
+    # One bit per letter of the alphabet that is present in each secret
+    present_bits = np.bitwise_or.reduce(np.left_shift(1, secrets, dtype=np.uint32), axis=1)
+    codes = np.zeros((len(guesses), len(secrets)), dtype=np.uint32)
+
+    for i in range(word_length):
+        guess_letters = guesses[:, i, None].astype(np.uint32)
+        present = (present_bits[None, :] >> guess_letters) & 1
+        green = secrets[None, :, i] == guess_letters
+        # A green letter is also present, so its digit adds up to 2
+        codes += (present + green) * 3 ** i
+
+    # The presence test is only right for guesses without repeated letters, the others are scored with budgets
+    ordered = np.sort(guesses, axis=1)
+    repeated = (ordered[:, 1:] == ordered[:, :-1]).any(axis=1)
+    if repeated.any():
+        codes[repeated] = score_repeated_letters(guesses[repeated], secrets)
+
+    return codes
+
+
+def score_repeated_letters(guesses, secrets):
+    """
+    Scores guesses with repeated letters, following score: the letter at position i is yellow if the secret has
+    more unmatched copies of it than the guess has non-green copies of it before position i.
+    :param guesses: a (G, word_length) letter matrix of the guesses
+    :param secrets: an (S, word_length) letter matrix of the secrets
+    :return: a (G, S) matrix of pattern codes
+    """
+    green = guesses[:, None, :] == secrets[None, :, :]
+    codes = np.zeros((len(guesses), len(secrets)), dtype=np.intp)
+
+    for i in range(guesses.shape[1]):
+        letter = guesses[:, i, None]
+        # The copies of the letter in the secret which are not matched by a green
+        budget = ((secrets[None, :, :] == letter[:, :, None]) & ~green).sum(axis=2)
+        # The copies of the letter already used as yellows by the earlier positions of the guess
+        used = ((guesses[:, None, :i] == letter[:, :, None]) & ~green[:, :, :i]).sum(axis=2)
+        yellow = ~green[:, :, i] & (budget > used)
+        codes += (GREEN * green[:, :, i] + YELLOW * yellow) * 3 ** i
+
+    return codes
+
+
+class FeedbackEngine:
+    def __init__(self, words_list: [list]):
+        """
+        Initializes a FeedbackEngine object, which scores every guess against every secret of a word list.
+        The full guess-by-secret table of pattern codes (the "pattern matrix") is built on demand, stored in
+        CACHE_DIR and memory-mapped on the next run.
+        :param words_list: a list of words of equal length, which are both the guesses and the secrets
+        """
+        if np is None:
+            raise RuntimeError("The feedback engine requires NumPy to be installed.")
+        self.words_list = words_list
+        self.word_length = len(words_list[0]) if len(words_list) else 0
+        self.letters = None
+        self.matrix = None
+
+    def word_matrix(self):
+        """
+        Returns the words as an (N, word_length) uint8 matrix of letter codes, 0 for 'a' up to 25 for 'z'.
+        :return: the letter matrix of the word list
+        """
+        if self.letters is None:
+            if isinstance(self.words_list, WordStore):
+                codes = self.words_list.as_array()
+            else:
+                encoded = "".join(self.words_list).encode("ascii")
+                codes = np.frombuffer(encoded, dtype=np.uint8).reshape(-1, self.word_length)
+            self.letters = codes - ord('a')
+
+        return self.letters
+
+    def pattern_block(self, guess_ids, secret_ids=None):
+        """
+        Scores a block of guesses against a block of secrets in a few array operations.
+        :param guess_ids: the ids (indices into the word list) of the guesses
+        :param secret_ids: the ids of the secrets, or None for every word of the list
+        :return: a (len(guess_ids), len(secret_ids)) matrix of pattern codes
+        """
+        letters = self.word_matrix()
+        secrets = letters if secret_ids is None else letters[secret_ids]
+
+        return score_letters(letters[guess_ids], secrets).astype(pattern_dtype(self.word_length))
+
+    def build_matrix(self, chunk_size: [int] = 128):
+        """
+        Builds the full guess-by-secret pattern matrix, a block of guesses at a time.
+        :param chunk_size: the number of guesses scored per block, which bounds the temporary memory used
+        :return: an (N, N) matrix where matrix[guess_id, secret_id] is the pattern code
+        """
+        count = len(self.words_list)
+        self.matrix = np.empty((count, count), dtype=pattern_dtype(self.word_length))
+
+        for start in range(0, count, chunk_size):
+            stop = min(start + chunk_size, count)
+            self.matrix[start:stop] = self.pattern_block(np.arange(start, stop))
+
+        return self.matrix
+
+    def matrix_path(self) -> str:
+        """
+        Returns the path of the cached pattern matrix of this word list.
+        :return: a path inside CACHE_DIR
+        """
+        return cache_path("patterns", self.words_list, ".npy")
+
+    def save_matrix(self, path: Optional[str] = None) -> str:
+        """
+        Saves the pattern matrix to disk, building it first if needed.
+        :param path: where to save the matrix, by default the path returned by matrix_path
+        :return: the path the matrix was saved to
+        """
+        if self.matrix is None:
+            self.build_matrix()
+        path = path or self.matrix_path()
+        atomic_write(path, lambda file: np.save(file, self.matrix))
+
+        return path
+
+    def load_matrix(self, path: Optional[str] = None):
+        """
+        Memory-maps a pattern matrix previously written by save_matrix.
+        :param path: the path of the matrix, by default the path returned by matrix_path
+        :return: the read-only pattern matrix, or None if no matching matrix is found on disk
+        """
+        path = path or self.matrix_path()
+        count = len(self.words_list)
+        try:
+            matrix = np.load(path, mmap_mode='r')
+        except (FileNotFoundError, ValueError):
+            return None
+
+        if matrix.shape != (count, count):  # A stale or foreign file
+            return None
+        self.matrix = matrix
+
+        return self.matrix
+
+    def get_matrix(self):
+        """
+        Returns the pattern matrix, loading it from the disk cache or building and caching it.
+        :return: the (N, N) pattern matrix
+        """
+        if self.matrix is None and len(self.words_list) > MATRIX_MAX_WORDS:
+            raise ValueError("The pattern matrix is limited to " + str(MATRIX_MAX_WORDS) + " words, the list has "
+                             + str(len(self.words_list)) + ".")
+        if self.matrix is None and self.load_matrix() is None:
+            self.save_matrix()
+
+        return self.matrix
+
+    def use_matrix(self):
+        """
+        Loads or builds the pattern matrix if the list has at most MATRIX_MAX_WORDS words. The patterns of larger
+        lists are scored on the fly, as their N x N matrix would not fit in memory.
+        :return: the pattern matrix, or None for a list too large for it
+        """
+        if len(self.words_list) > MATRIX_MAX_WORDS:
+            return None
+
+        return self.get_matrix()
+
+    def patterns(self, guess_ids, secret_ids=None):
+        """
+        Returns the pattern codes of some guesses against some secrets, sliced from the matrix when it is available
+        and computed otherwise.
+        :param guess_ids: the id of one guess, or the ids of the guesses as a slice or an array
+        :param secret_ids: the ids of the secrets, or None for every word of the list
+        :return: a (guesses, secrets) matrix of pattern codes, or the row of secrets for a single guess id
+        """
+        if self.matrix is None:
+            if isinstance(guess_ids, (int, np.integer)):
+                return self.pattern_block([guess_ids], secret_ids)[0]
+            if isinstance(guess_ids, slice):
+                guess_ids = np.arange(len(self.words_list))[guess_ids]
+            return self.pattern_block(guess_ids, secret_ids)
+
+        rows = self.matrix[guess_ids]
+        # take keeps the rows contiguous, where rows[..., secret_ids] would return them in column-major order
+        return rows if secret_ids is None else rows.take(secret_ids, axis=-1)
+
+    def bucket_log_sums(self, block, groups=0, num_groups: [int] = 1, table=None):
+        """
+        Sorts the pattern codes of a block of guesses into buckets, one set of buckets per group of secrets, and sums
+        c * log2(c) over the bucket sizes c of every guess and group. Short words count the buckets with one dense
+        bincount; for long words, where 3 ** word_length buckets per guess would not fit in memory, only the
+        buckets which occur are counted.
+        :param block: a (guesses, secrets) matrix of pattern codes
+        :param groups: the group of every secret (column), or 0 when all the secrets form one group
+        :param num_groups: the number of groups
+        :param table: c * log2(c) for c = 0, 1, ... up to the largest group size
+        :return: a (guesses, num_groups) array of the sums
+        """
+        rows = len(block)
+        num_patterns = 3 ** self.word_length
+        owners = np.arange(rows, dtype=np.intp)[:, None] * num_groups + groups
+        # Offset the codes of every guess and group, so that one count covers the buckets of the whole block
+        keys = (block + owners * num_patterns).ravel()
+
+        if rows * num_groups * num_patterns <= DENSE_BUCKETS:
+            buckets = np.bincount(keys, minlength=rows * num_groups * num_patterns)
+            return table[buckets].reshape(rows, num_groups, num_patterns).sum(axis=2)
+
+        keys, sizes = np.unique(keys, return_counts=True)
+        sums = np.bincount(keys // num_patterns, weights=table[sizes], minlength=rows * num_groups)
+        return sums.reshape(rows, num_groups)
+
+    @staticmethod
+    def size_log_size(count: [int]):
+        """
+        Returns the table of c * log2(c) for c = 0 to count, used to turn bucket sizes into entropies.
+        :param count: the largest bucket size
+        :return: an array of count + 1 values
+        """
+        sizes = np.arange(count + 1, dtype=np.float64)
+        table = np.zeros(count + 1)
+        table[1:] = sizes[1:] * np.log2(sizes[1:])
+
+        return table
+
+    def entropies(self, candidate_ids=None, chunk_size: [int] = 32):
+        """
+        Returns, for every word of the list used as the guess, the expected information (in bits) of its feedback
+        over the remaining candidates, i.e. the entropy of the distribution of the pattern codes.
+        :param candidate_ids: the ids of the remaining candidate secrets, or None for every word of the list
+        :param chunk_size: the number of guesses counted per block, which bounds the temporary memory used
+        :return: an array with the entropy of every guess
+        """
+        count = len(self.words_list) if candidate_ids is None else len(candidate_ids)
+        entropies = np.empty(len(self.words_list))
+        # H = log2(n) - sum(c * log2(c)) / n over the bucket sizes c, with c * log2(c) looked up from a table
+        table = self.size_log_size(count)
+        # Gather the candidate columns of the matrix once, rather than out of every block of rows
+        columns = self.patterns(slice(None), candidate_ids) if self.matrix is not None else None
+
+        for start in range(0, len(self.words_list), chunk_size):
+            if columns is None:
+                block = self.patterns(slice(start, start + chunk_size), candidate_ids)
+            else:
+                block = columns[start:start + chunk_size]
+            sums = self.bucket_log_sums(block, table=table)[:, 0]
+            entropies[start:start + len(block)] = np.log2(count) - sums / count
+
+        return entropies
+
+    def board_entropies(self, candidate_groups: [list], guess_ids=None, chunk_size: [int] = 128):
+        """
+        Returns, for every guess, the sum over several boards of the expected information of its feedback over the
+        candidates of each board. The candidates of all the boards are scored in one pass per block of guesses.
+        :param candidate_groups: one array of candidate secret ids per board
+        :param guess_ids: the ids of the guesses to rank, by default every word of the list
+        :param chunk_size: the number of guesses counted per block, which bounds the temporary memory used
+        :return: an array with the total entropy of every guess
+        """
+        guess_ids = np.arange(len(self.words_list)) if guess_ids is None else np.asarray(guess_ids)
+        sizes = np.array([len(group) for group in candidate_groups])
+        candidates = np.concatenate(candidate_groups)
+        groups = np.repeat(np.arange(len(candidate_groups)), sizes)
+        table = self.size_log_size(int(sizes.max()))
+        entropies = np.empty(len(guess_ids))
+
+        for start in range(0, len(guess_ids), chunk_size):
+            block = self.patterns(guess_ids[start:start + chunk_size], candidates)
+            sums = self.bucket_log_sums(block, groups, len(candidate_groups), table)
+            entropies[start:start + len(block)] = (np.log2(sizes) - sums / sizes).sum(axis=1)
+
+        return entropies
+
+    def best_guess(self, candidate_ids=None) -> int:
+        """
+        Returns the guess which maximizes the expected entropy of the feedback over the remaining candidates.
+        Among equally good guesses, a remaining candidate is preferred because it may be the secret word.
+        :param candidate_ids: the ids of the remaining candidate secrets, or None for every word of the list
+        :return: the id of the best guess
+        """
+        if candidate_ids is not None and len(candidate_ids) <= 2:
+            return int(candidate_ids[0])
+
+        entropies = self.entropies(candidate_ids)
+        if candidate_ids is not None:
+            entropies[candidate_ids] += 1e-9
+
+        return int(np.argmax(entropies))
+
+    def opening_path(self) -> str:
+        """
+        Returns the path of the cached opening guess of this word list.
+        :return: a path inside CACHE_DIR
+        """
+        return cache_path("opening", self.words_list, ".txt")
+
+    def best_opening(self) -> int:
+        """
+        Returns the best first guess over the whole word list. It never changes for a given list, so it is computed
+        once and then read back from CACHE_DIR. Lists too large for the pattern matrix pick it among a sample of the
+        words, scored against the same sample.
+        :return: the id of the opening guess
+        """
+        path = self.opening_path()
+        try:
+            with open(path, 'r') as file:
+                word = file.read().strip()
+            if word in self.words_list:
+                return self.words_list.index(word)
+        except OSError:
+            pass
+
+        if self.use_matrix() is None:
+            sample = np.arange(0, len(self.words_list), max(1, len(self.words_list) // OPENING_SAMPLE))
+            guess_id = int(sample[np.argmax(self.board_entropies([sample], sample))])
+        else:
+            guess_id = self.best_guess()
+        atomic_write(path, lambda file: file.write((self.words_list[guess_id] + "\n").encode("utf-8")))
+
+        return guess_id
+
+    def pattern(self, guess_id: [int], secret_id: [int]) -> int:
+        """
+        Returns the pattern code of a guess against a secret, from the matrix when it is available.
+        :param guess_id: the id of the guessed word
+        :param secret_id: the id of the secret word
+        :return: the pattern code
+        """
+        if self.matrix is not None:
+            return int(self.matrix[guess_id, secret_id])
+
+        return score(self.words_list[secret_id], self.words_list[guess_id])
+
+
+def opening_stats(letters, guess_ids, chunk_size: [int] = 64):
+    """
+    Scores some guesses as openers against every word of a letter matrix used as the secret. The feedback of a guess
+    splits the secrets into buckets, one per pattern code, and for every guess three figures of those bucket sizes c
+    are returned: the entropy of the feedback in bits, the expected number of remaining candidates sum(c * c) / n and
+    the size of the largest bucket.
+    :param letters: an (N, word_length) letter matrix of every word
+    :param guess_ids: the ids of the guesses to score, as a range or an array
+    :param chunk_size: the number of guesses scored per block, which bounds the temporary memory used
+    :return: a tuple of three arrays: the entropy, the expected remaining candidates and the worst case of every guess
+    """
+    guess_ids = np.asarray(guess_ids)
+    count = len(letters)
+    num_patterns = 3 ** letters.shape[1]
+    table = FeedbackEngine.size_log_size(count)
+    entropy = np.empty(len(guess_ids))
+    expected = np.empty(len(guess_ids))
+    worst = np.empty(len(guess_ids), dtype=np.int64)
+
+    for start in range(0, len(guess_ids), chunk_size):
+        block = score_letters(letters[guess_ids[start:start + chunk_size]], letters)
+        rows = len(block)
+        keys = (block + np.arange(rows, dtype=np.intp)[:, None] * num_patterns).ravel()
+
+        if rows * num_patterns <= DENSE_BUCKETS:
+            buckets = np.bincount(keys, minlength=rows * num_patterns).reshape(rows, num_patterns)
+            sums = table[buckets].sum(axis=1)
+            squares = (buckets * buckets).sum(axis=1)
+            largest = buckets.max(axis=1)
+        else:
+            # Only count the buckets which occur, as in FeedbackEngine.bucket_log_sums
+            keys, sizes = np.unique(keys, return_counts=True)
+            owners = keys // num_patterns
+            sums = np.bincount(owners, weights=table[sizes], minlength=rows)
+            squares = np.bincount(owners, weights=sizes * sizes, minlength=rows)
+            largest = np.zeros(rows, dtype=np.int64)
+            np.maximum.at(largest, owners, sizes)
+
+        stop = start + rows
+        entropy[start:stop] = np.log2(count) - sums / count
+        expected[start:stop] = squares / count
+        worst[start:stop] = largest
+
+    return entropy, expected, worst
+
+
+class OpeningTable:
+    DTYPE = [("word_id", "<i4"), ("entropy", "<f8"), ("expected", "<f8"), ("worst", "<i4")]
+    METRICS = ("entropy", "expected", "worst")
+
+    def __init__(self, words_list: [list], rows):
+        """
+        Initializes an OpeningTable object, the ranking of every word of a list as the first guess. Each row holds the
+        word id and its entropy, expected remaining candidates and worst case (see opening_stats), and the rows are
+        sorted from the best opener down, by entropy. The table is built offline by openers.py, stored in CACHE_DIR
+        and memory-mapped, so the autoplay mode picks its opener without scoring anything.
+        :param words_list: the list of words the table ranks
+        :param rows: a structured array of DTYPE, in rank order
+        """
+        self.words_list = words_list
+        self.rows = rows
+
+    @classmethod
+    def from_stats(cls, words_list: [list], entropy, expected, worst) -> 'OpeningTable':
+        """
+        Ranks the words of a list from the figures of opening_stats, by decreasing entropy, then by expected
+        remaining candidates and worst case.
+        :param words_list: the list of words the figures belong to
+        :param entropy: the entropy of every word, in word id order
+        :param expected: the expected remaining candidates of every word
+        :param worst: the worst case of every word
+        :return: a new OpeningTable object
+        """
+        order = np.lexsort((worst, expected, -entropy))
+        rows = np.empty(len(order), dtype=cls.DTYPE)
+        rows["word_id"] = order
+        rows["entropy"] = entropy[order]
+        rows["expected"] = expected[order]
+        rows["worst"] = worst[order]
+
+        return cls(words_list, rows)
+
+    @classmethod
+    def build(cls, words_list: [list], chunk_size: [int] = 64) -> 'OpeningTable':
+        """
+        Scores every word of a list as the opener, in this process. See openers.py for the parallel build.
+        :param words_list: the list of words, used both as the guesses and as the secret words
+        :param chunk_size: the number of guesses scored per block
+        :return: a new OpeningTable object
+        """
+        letters = FeedbackEngine(words_list).word_matrix()
+        return cls.from_stats(words_list, *opening_stats(letters, range(len(words_list)), chunk_size))
+
+    @staticmethod
+    def path(words_list: [list]) -> str:
+        """
+        Returns the path of the cached opening table of a word list.
+        :param words_list: the list of words the table ranks
+        :return: a path inside CACHE_DIR
+        """
+        return cache_path("openers", words_list, ".npy")
+
+    def save(self, path: Optional[str] = None) -> str:
+        """
+        Saves the table to disk, through a temporary file so that a concurrent reader never maps a partial table.
+        :param path: where to save the table, by default the path returned by path
+        :return: the path the table was saved to
+        """
+        path = path or self.path(self.words_list)
+        atomic_write(path, lambda file: np.save(file, self.rows))
+
+        return path
+
+    @classmethod
+    def load(cls, words_list: [list], path: Optional[str] = None) -> Optional['OpeningTable']:
+        """
+        Memory-maps a table previously written by save.
+        :param words_list: the list of words the table ranks
+        :param path: the path of the table, by default the path returned by path
+        :return: the table, or None if no matching table is found on disk
+        """
+        path = path or cls.path(words_list)
+        try:
+            rows = np.load(path, mmap_mode='r')
+        except (FileNotFoundError, ValueError):
+            return None
+
+        if rows.dtype != np.dtype(cls.DTYPE) or rows.shape != (len(words_list),):  # A stale or foreign file
+            return None
+
+        return cls(words_list, rows)
+
+    def ranked(self, metric: [str] = "entropy"):
+        """
+        Returns the rows of the table ranked by one metric, the best opener first.
+        :param metric: 'entropy' (highest first), 'expected' or 'worst' (lowest first)
+        :return: a structured array of DTYPE
+        """
+        if metric not in self.METRICS:
+            raise ValueError("Unknown opener metric: " + str(metric))
+        if metric == "entropy":
+            return self.rows
+        # A stable sort keeps the entropy order among equal values
+        return self.rows[np.argsort(self.rows[metric], kind="stable")]
+
+    def best(self, metric: [str] = "entropy") -> str:
+        """
+        Returns the best opener of the word list by one metric.
+        :param metric: 'entropy', 'expected' or 'worst'
+        :return: the opening word
+        """
+        if metric == "entropy":
+            return self.words_list[int(self.rows[0]["word_id"])]
+        row = self.rows[int(np.argmin(self.rows[metric]))]
+
+        return self.words_list[int(row["word_id"])]
+
+
+class DecisionTree:
+    MAGIC = b"WTRE"
+    VERSION = 1
+    # magic, version, pattern version, number of nodes, number of edges, SHA-1 of the word list
+    HEADER = struct.Struct("<4sIIII20s")
+    HEADER_SIZE = 64  # the header is padded, so that the arrays start at an aligned offset
+    ROOT = 0
+
+    def __init__(self, words_list: [list], nodes, edges):
+        """
+        Initializes a DecisionTree object, a precomputed solver for a word list. Each node holds the guess to make
+        and an edge per possible feedback pattern to the node of the next guess, so every autoplay turn is a single
+        lookup. The tree is stored as two flat int32 arrays:
+        - nodes: one row (guess id, first edge, number of edges) per node, the root being node 0
+        - edges: one row (pattern code, child node) per edge, sorted by pattern code within a node
+        The all-green pattern has no edge, since the game ends there.
+        :param words_list: the list of words the tree was built for
+        :param nodes: the (number of nodes, 3) node array
+        :param edges: the (number of edges, 2) edge array
+        """
+        self.words_list = words_list
+        self.nodes = nodes
+        self.edges = edges
+
+    @staticmethod
+    def build_subtree(engine: [FeedbackEngine], candidate_ids, first_guess: Optional[int] = None) -> tuple:
+        """
+        Builds the tree which solves every candidate secret, picking the entropy-maximizing guess at each node.
+        :param engine: the feedback engine of the word list
+        :param candidate_ids: the ids of the secrets the subtree must solve
+        :param first_guess: the guess of the subtree's root, by default the best guess for the candidates
+        :return: a tuple of the node and edge arrays of the subtree, numbered from 0
+        """
+        nodes, edges = [], []
+        solved = 3 ** engine.word_length - 1  # the all-green pattern code
+        pending = [(np.asarray(candidate_ids), first_guess, -1)]  # (candidates, guess, parent edge to patch)
+
+        # Depth-first, so that the nodes of a subtree are stored next to each other
+        while pending:
+            candidates, guess_id, parent_edge = pending.pop()
+            if guess_id is None:
+                guess_id = engine.best_guess(candidates)
+            if parent_edge >= 0:
+                edges[parent_edge][1] = len(nodes)
+
+            codes = engine.patterns(guess_id, candidates)
+            patterns = np.unique(codes)
+            patterns = patterns[patterns != solved]
+            nodes.append([guess_id, len(edges), len(patterns)])
+
+            for code in patterns:
+                edges.append([int(code), -1])
+            # Push in reverse, so that the children are built in increasing pattern order
+            for edge, code in reversed(list(enumerate(patterns, len(edges) - len(patterns)))):
+                pending.append((candidates[codes == code], None, edge))
+
+        return (np.array(nodes, dtype=np.int32).reshape(-1, 3), np.array(edges, dtype=np.int32).reshape(-1, 2))
+
+    @classmethod
+    def from_subtrees(cls, words_list: [list], root_guess: [int], subtrees: [list]) -> 'DecisionTree':
+        """
+        Joins subtrees built separately (e.g. in parallel) under a root node.
+        :param words_list: the list of words the tree was built for
+        :param root_guess: the id of the first guess
+        :param subtrees: a list of (pattern code, node array, edge array), one per pattern of the root guess
+        :return: the joined tree
+        """
+        subtrees = sorted(subtrees, key=lambda subtree: subtree[0])
+        node_count = 1 + sum(len(nodes) for _, nodes, _ in subtrees)
+        edge_count = len(subtrees) + sum(len(edges) for _, _, edges in subtrees)
+        all_nodes = np.empty((node_count, 3), dtype=np.int32)
+        all_edges = np.empty((edge_count, 2), dtype=np.int32)
+        all_nodes[cls.ROOT] = (root_guess, 0, len(subtrees))
+
+        # Relocate the node and edge numbers of every subtree after the ones before it
+        node_base, edge_base = 1, len(subtrees)
+        for edge, (code, nodes, edges) in enumerate(subtrees):
+            all_edges[edge] = (code, node_base)
+            all_nodes[node_base:node_base + len(nodes)] = nodes
+            all_nodes[node_base:node_base + len(nodes), 1] += edge_base
+            all_edges[edge_base:edge_base + len(edges)] = edges
+            all_edges[edge_base:edge_base + len(edges), 1] += node_base
+            node_base += len(nodes)
+            edge_base += len(edges)
+
+        return cls(words_list, all_nodes, all_edges)
+
+    @classmethod
+    def build(cls, engine: [FeedbackEngine]) -> 'DecisionTree':
+        """
+        Builds the tree of a whole word list in this process (see solver_tree.py for a parallel build). The tree is
+        built from the pattern matrix, so the list must have at most MATRIX_MAX_WORDS words.
+        :param engine: the feedback engine of the word list
+        :return: the tree
+        """
+        engine.get_matrix()
+        nodes, edges = cls.build_subtree(engine, np.arange(len(engine.words_list)), engine.best_opening())
+        return cls(engine.words_list, nodes, edges)
+
+    @staticmethod
+    def path(words_list: [list]) -> str:
+        """
+        Returns the path of the cached tree of a word list.
+        :param words_list: the list of words
+        :return: a path inside CACHE_DIR
+        """
+        return cache_path("tree", words_list, ".bin")
+
+    def save(self, path: Optional[str] = None) -> str:
+        """
+        Writes the tree to disk, through a temporary file so that a concurrent reader never maps a partial tree.
+        :param path: where to save the tree, by default the path returned by DecisionTree.path
+        :return: the path the tree was saved to
+        """
+        path = path or self.path(self.words_list)
+        header = self.HEADER.pack(self.MAGIC, self.VERSION, PATTERN_VERSION, len(self.nodes), len(self.edges),
+                                  bytes.fromhex(word_list_digest(self.words_list)))
+
+        def write(file):
+            file.write(header.ljust(self.HEADER_SIZE, b"\0"))
+            file.write(np.ascontiguousarray(self.nodes, dtype=np.int32).tobytes())
+            file.write(np.ascontiguousarray(self.edges, dtype=np.int32).tobytes())
+
+        atomic_write(path, write)
+
+        return path
+
+    @classmethod
+    def load(cls, words_list: [list], path: Optional[str] = None) -> Optional['DecisionTree']:
+        """
+        Memory-maps a tree written by save.
+        :param words_list: the list of words the tree must have been built for
+        :param path: the path of the tree, by default the path returned by DecisionTree.path
+        :return: the tree, or None if no matching tree is found on disk
+        """
+        path = path or cls.path(words_list)
+        try:
+            with open(path, 'rb') as file:
+                header = file.read(cls.HEADER.size)
+        except OSError:
+            return None
+        if len(header) < cls.HEADER.size:
+            return None
+
+        magic, version, pattern_version, node_count, edge_count, digest = cls.HEADER.unpack(header)
+        if (magic != cls.MAGIC or version != cls.VERSION or pattern_version != PATTERN_VERSION
+                or digest.hex() != word_list_digest(words_list)):
+            return None
+        nodes = np.memmap(path, dtype=np.int32, mode='r', offset=cls.HEADER_SIZE, shape=(node_count, 3))
+        edges = np.memmap(path, dtype=np.int32, mode='r', offset=cls.HEADER_SIZE + nodes.nbytes,
+                          shape=(max(edge_count, 1), 2))[:edge_count]
+
+        return cls(words_list, nodes, edges)
+
+    def guess(self, node: [int]) -> int:
+        """
+        Returns the guess to make at a node.
+        :param node: the node number
+        :return: the id of the guess
+        """
+        return int(self.nodes[node, 0])
+
+    def child(self, node: [int], code: [int]) -> int:
+        """
+        Follows the edge of a feedback pattern.
+        :param node: the node number of the guess which was made
+        :param code: the pattern code of the feedback to that guess
+        :return: the node of the next guess, or -1 if no secret of the tree gives that feedback
+        """
+        first, count = int(self.nodes[node, 1]), int(self.nodes[node, 2])
+        patterns = self.edges[first:first + count, 0]
+        position = int(np.searchsorted(patterns, code))
+        if position < count and patterns[position] == code:
+            return int(self.edges[first + position, 1])
+
+        return -1
+
+    def solve(self, secret: [str]) -> [list]:
+        """
+        Follows the tree for a secret word.
+        :param secret: the secret word
+        :return: the list of guess ids made, ending with the secret's id unless the tree does not solve it
+        """
+        guesses = []
+        node = self.ROOT
+        while node >= 0:
+            guess_id = self.guess(node)
+            guesses.append(guess_id)
+            guess = self.words_list[guess_id]
+            if guess == secret:
+                break
+            node = self.child(node, score(secret, guess))
+
+        return guesses
+
+    def depths(self):
+        """
+        Returns the number of guesses the tree needs for every secret word.
+        :return: an array, indexed by word id, of the number of guesses (0 for the words the tree does not solve)
+        """
+        depths = np.zeros(len(self.words_list), dtype=np.int32)
+        for secret_id, secret in enumerate(self.words_list):
+            guesses = self.solve(secret)
+            if guesses[-1] == secret_id:
+                depths[secret_id] = len(guesses)
+
+        return depths
+
+
+class MultiBoardSolver:
+    def __init__(self, words_list: [list], engine: Optional[FeedbackEngine] = None):
+        """
+        Initializes a MultiBoardSolver object, which solves several secret words at once (as in Quordle), every guess
+        being played on all the boards which are not solved yet. The candidates of every board are the words which
+        would have given the same feedback as its secret word so far, and each guess maximizes the sum of the
+        expected information over the active boards. To bound the time of a turn, the guesses scored are a sample of
+        the candidates plus the words preselected by probe_words, at most BOARD_POOL of each, and they are scored
+        against at most BOARD_SAMPLE candidates per board. Lists of up to MATRIX_MAX_WORDS words use the cached
+        pattern matrix; larger ones are scored on the fly, with at most BOARD_POOL_LARGE guesses of each kind.
+        :param words_list: the list of words, used both as the guesses and as the secret words
+        :param engine: the feedback engine of the word list, by default a new one
+        """
+        self.words_list = words_list
+        self.engine = engine or FeedbackEngine(words_list)
+        self.large = self.engine.use_matrix() is None
+        self.opening = None
+        self.presence = None
+
+    def get_opening(self) -> int:
+        """
+        Returns the first guess, which is the same for every board (see FeedbackEngine.best_opening).
+        :return: the id of the opening guess
+        """
+        if self.opening is None:
+            self.opening = self.engine.best_opening()
+
+        return self.opening
+
+    def choose(self, candidate_groups: [list]) -> int:
+        """
+        Picks the next guess for the active boards.
+        :param candidate_groups: one array of candidate ids per active board
+        :return: the id of the guess
+        """
+        # A board with a single candidate left is solved by guessing it
+        for group in candidate_groups:
+            if len(group) == 1:
+                return int(group[0])
+
+        candidates = np.concatenate(candidate_groups)
+        size = BOARD_POOL_LARGE if self.large else BOARD_POOL
+        groups = [self.sample(group, BOARD_SAMPLE) for group in candidate_groups]
+        pool = np.union1d(self.sample(np.unique(candidates), size), self.probe_words(groups, size))
+
+        entropies = self.engine.board_entropies(groups, pool)
+        # Among equally good guesses, prefer one which may be the secret word of a board
+        entropies[np.isin(pool, candidates)] += 1e-9
+        return int(pool[np.argmax(entropies)])
+
+    def probe_words(self, candidate_groups: [list], size: [int]):
+        """
+        Preselects the words most likely to split the candidates, before their entropies are computed: a letter is
+        worth f * (1 - f) on a board where a fraction f of the candidates contain it, and a word is worth the sum over
+        the boards of its distinct letters.
+        :param candidate_groups: one array of candidate ids per active board
+        :param size: the number of words returned
+        :return: the ids of the words with the highest worth
+        """
+        if self.presence is None:
+            letters = self.engine.word_matrix()
+            self.presence = np.zeros((len(letters), 26), dtype=np.float32)
+            self.presence[np.arange(len(letters))[:, None], letters] = 1
+
+        worth = np.zeros(26, dtype=np.float32)
+        for group in candidate_groups:
+            fractions = self.presence[group].mean(axis=0)
+            worth += fractions * (1 - fractions)
+        scores = self.presence @ worth
+        if len(scores) <= size:
+            return np.arange(len(scores))
+
+        return np.argpartition(scores, -size)[-size:]
+
+    @staticmethod
+    def sample(ids, size: [int]):
+        """
+        Returns at most size ids, spread evenly over the given ones.
+        :param ids: a sorted array of ids
+        :param size: the largest number of ids returned
+        :return: the ids themselves, or an evenly spaced subset of them
+        """
+        if len(ids) <= size:
+            return ids
+        return ids[np.linspace(0, len(ids) - 1, size).astype(np.intp)]
+
+    def solve(self, secrets: [list]):
+        """
+        Solves several secret words at once. Every guess is scored against the secret words of all the active boards
+        in one pass, and the candidates of all the active boards are narrowed in one pass.
+        :param secrets: the secret word of every board
+        :return: A generator of (guess, results) tuples, where results holds the list of 'gray', 'yellow', 'green'
+            values of every board, or None for the boards solved before that guess.
+        """
+        engine = self.engine
+        word_length = engine.word_length
+        solved = 3 ** word_length - 1  # the all-green pattern code
+        secret_ids = np.array([self.words_list.index(secret) for secret in secrets])
+        candidates = [np.arange(len(self.words_list))] * len(secrets)
+        active = np.arange(len(secrets))
+        guess_id = self.get_opening()
+
+        while True:
+            codes = np.asarray(engine.patterns(guess_id, secret_ids[active])).astype(np.intp)
+            results = [None] * len(secrets)
+            for board, code in zip(active, codes):
+                results[board] = decode_pattern(int(code), word_length)
+            yield self.words_list[guess_id], results
+
+            # Keep, on every board, the candidates which give the same feedback as its secret word
+            sizes = [len(candidates[board]) for board in active]
+            ids = np.concatenate([candidates[board] for board in active])
+            boards = np.repeat(np.arange(len(active)), sizes)
+            keep = engine.patterns(guess_id, ids) == np.repeat(codes, sizes)
+            kept = np.bincount(boards[keep], minlength=len(active))
+            for board, group in zip(active, np.split(ids[keep], np.cumsum(kept)[:-1])):
+                candidates[board] = group
+
+            active = active[(codes != solved) & (kept > 0)]
+            if not len(active):
+                return
+            guess_id = self.choose([candidates[board] for board in active])
+
+
+def find_matched_words(words: [str], grays: [str], yellows: {}, greens: {}, command: [str],
+                       counts: Optional[dict] = None) -> Union[str, List[str], None]:
+    """
+    Given a list of words and constraints, it returns a suitable word, if it exists, otherwise the constant 'None'.
+    The constraints are:
+    - grays: A list of characters which are known to not exist in the target word
+    - yellows: A dictionary of characters to sets of indices. The keys are characters, and the corresponding values
+        are sets of integers, indicating the indices where it is known that the corresponding character is NOT at.
+    - greens: A dictionary of characters to sets of indices. The keys are characters, and the corresponding values
+        are sets of integers, indicating the indices where it is known that the corresponding character is found at.
+    - counts: An optional dictionary of characters to (minimum, maximum) numbers of occurrences, learned from the
+        repeated letters of the guesses (see update_constraints).
+    For example, the call:
+        find_word(['batch', 'ozone'], 'abcd', {'n': {2}, 'z': {2, 3}}, {'o': {0, 2}, 'e': {4}})
+    It looks for a word in the given list so that it does not contain any of the characters 'a', 'b', 'c', 'd'.
+    Also, it contains 'n' but not at index 2, and 'z' but not at indices 2, or 3.
+    Finally, it contains 'o' at indices 0, 2, and it also contains 'e' at index 4.
+    This for example excludes 'batch' but could return 'ozone'.
+    remember that the indices are 0-base which means the first position is index 0, and the last one (5th) is index 4.
+    Large lists are checked with NumPy (see find_matched_ids) when it is available, and with
+    find_matched_words_python otherwise.
+    :param words: the list of words to be checked against the constraints
+    :param grays: a list of characters in the form of a string (gray constraint)
+    :param yellows: a dictionary of characters to set of indices (yellow constraint)
+    :param greens: a dictionary of characters to set of indices (green constraint)
+    :param command: either "word" or "list" to specify the return type
+    :param counts: a dictionary of characters to (minimum, maximum) numbers of occurrences (count constraint)
+    :return: a word from the given list which satisfies the constraints, or None if none is found
+    """
+    matrix = word_matrix(words) if len(words) >= VECTORIZE_MIN_WORDS else None
+    if matrix is None:
+        return find_matched_words_python(words, grays, yellows, greens, command, counts)
+
+    matched_ids = find_matched_ids(matrix, grays, yellows, greens, counts=counts)
+    if len(matched_ids):
+        if command == "word":
+            return words[matched_ids[0]]
+        elif command == "list":
+            return [words[word_id] for word_id in matched_ids]
+    else:
+        return None
+
+
+def find_matched_words_python(words: [str], grays: [str], yellows: {}, greens: {}, command: [str],
+                              counts: Optional[dict] = None) -> Union[str, List[str], None]:
+    """
+    Pure-Python find_matched_words, used for short lists or when NumPy is unavailable.
+    :param words: the list of words to be checked against the constraints
+    :param grays: a list of characters in the form of a string (gray constraint)
+    :param yellows: a dictionary of characters to set of indices (yellow constraint)
+    :param greens: a dictionary of characters to set of indices (green constraint)
+    :param command: either "word" or "list" to specify the return type
+    :param counts: a dictionary of characters to (minimum, maximum) numbers of occurrences (count constraint)
+    :return: a word from the given list which satisfies the constraints, or None if none is found
+    """
+    matched_words = []
+    counts = counts or {}
+
+    # Check gray constraint
+    for word in words:
+        for gray_letter in grays:
+            if gray_letter in word:
+                break
+        else:
+            # Check yellow constraint
+            for yellow_letter, yellow_indices in yellows.items():
+                if yellow_letter not in word:
+                    break
+                # Find all occurrences of yellow_letter in the word
+                letter_indices = [i for i, char in enumerate(word) if char == yellow_letter]
+                # Check if any occurrence satisfies the constraint
+                if set(letter_indices).intersection(yellow_indices):
+                    break
+            else:
+                # Check green constraint: the letter is at every one of the given indices
+                for green_letter, green_indices in greens.items():
+                    if green_letter not in word:
+                        break
+                    # Check if all specified indices are covered
+                    if not all(0 <= i < len(word) and word[i] == green_letter for i in green_indices):
+                        break
+                else:
+                    # Check count constraint
+                    for letter, (minimum, maximum) in counts.items():
+                        if not minimum <= word.count(letter) <= maximum:
+                            break
+                    else:
+                        matched_words.append(word)
+
+    if matched_words:
+        if command == "word":
+            return matched_words[0]
+        elif command == "list":
+            return matched_words
+    else:
+        return None
+
+
+def find_matched_ids(matrix, grays: [str], yellows: {}, greens: {}, candidates=None, counts: Optional[dict] = None):
+    """
+    Vectorized find_matched_words: every constraint is evaluated as a boolean mask over the rows of a word matrix.
+    :param matrix: an (N, word_length) matrix of ASCII codes, as returned by word_matrix
+    :param grays: a list of characters in the form of a string (gray constraint)
+    :param yellows: a dictionary of characters to set of indices (yellow constraint)
+    :param greens: a dictionary of characters to set of indices (green constraint)
+    :param candidates: an array of row indices to restrict the search to, by default every row
+    :param counts: a dictionary of characters to (minimum, maximum) numbers of occurrences (count constraint)
+    :return: an array of the row indices of the matched words, in increasing order
+    """
+    if candidates is not None:
+        candidates = np.asarray(candidates, dtype=np.intp)
+        return candidates[find_matched_ids(matrix[candidates], grays, yellows, greens, counts=counts)]
+    word_length = matrix.shape[1]
+
+    def at_positions(letter: [str], indices: [set]):
+        # Which rows have the letter at any of the given indices
+        mask = np.zeros(len(matrix), dtype=bool)
+        if len(letter) == 1 and ord(letter) < 128:
+            for i in indices:
+                if 0 <= i < word_length:
+                    mask |= matrix[:, i] == ord(letter)
+        return mask
+
+    # Check gray constraint
+    matched = np.ones(len(matrix), dtype=bool)
+    for gray_letter in grays:
+        matched &= ~letter_mask(matrix, gray_letter)
+
+    # Check yellow constraint: the letter is present, but at none of the given indices
+    for yellow_letter, yellow_indices in yellows.items():
+        matched &= letter_mask(matrix, yellow_letter)
+        matched &= ~at_positions(yellow_letter, yellow_indices)
+
+    # Check green constraint: the letter is at every one of the given indices
+    for green_letter, green_indices in greens.items():
+        matched &= letter_mask(matrix, green_letter)
+        for i in green_indices:
+            matched &= at_positions(green_letter, {i})
+
+    # Check count constraint
+    for letter, (minimum, maximum) in (counts or {}).items():
+        occurrences = np.zeros(len(matrix), dtype=np.intp)
+        if len(letter) == 1 and ord(letter) < 128:
+            occurrences = (matrix == ord(letter)).sum(axis=1)
+        matched &= (occurrences >= minimum) & (occurrences <= maximum)
+
+    return np.flatnonzero(matched)
+
+
+def update_constraints(guess: [str], result: [list], grays: [list], yellows: {}, greens: {},
+                       counts: Optional[dict] = None):
+    """
+    Adds the constraints learned from the result of a guess to the gray, yellow and green constraints, in the
+    form expected by find_matched_words.
+    A gray letter which is also green or yellow elsewhere in the guess is in the target word, just not at that index
+    (a yellow constraint), and as many times as it is green or yellow in the guess (a count constraint).
+    :param guess: the guessed word
+    :param result: the list of 'gray', 'yellow', 'green' values returned by check for the guess
+    :param grays: a list of characters which are known to not exist in the target word, extended in place
+    :param yellows: a dictionary of characters to set of indices (yellow constraint), updated in place
+    :param greens: a dictionary of characters to set of indices (green constraint), updated in place
+    :param counts: a dictionary of characters to (minimum, maximum) numbers of occurrences, updated in place
+    """
+    # The number of green or yellow copies of every letter of the guess, which the target word has at least
+    present = {}
+    for letter, colour in zip(guess, result):
+        if colour != "gray":
+            present[letter] = present.get(letter, 0) + 1
+
+    # Iterate over each character and its corresponding color
+    for i, colour in enumerate(result):
+        letter = guess[i]
+        if colour == "gray":
+            if letter in present:
+                if letter in yellows:
+                    yellows[letter].add(i)
+                else:
+                    yellows[letter] = {i}
+            elif letter not in grays:  # Check if letter has already been added
+                grays.append(letter)
+        elif colour == "yellow":
+            if letter in yellows:
+                yellows[letter].add(i)
+            else:
+                yellows[letter] = {i}
+        elif colour == "green":
+            if letter in greens:
+                greens[letter].add(i)
+            else:
+                greens[letter] = {i}
+
+    if counts is not None:
+        for letter, minimum in present.items():
+            known_minimum, maximum = counts.get(letter, (0, len(guess)))
+            if any(guess_letter == letter and colour == "gray" for guess_letter, colour in zip(guess, result)):
+                maximum = min(maximum, minimum)
+            counts[letter] = (max(known_minimum, minimum), maximum)
+
+
+# The offsets of the set bits of every byte value, used to turn a bitset into a list of word ids
+_BYTE_BITS = tuple(tuple(bit for bit in range(8) if byte >> bit & 1) for byte in range(256))
+
+
+def bits_to_ids(bits: [int]) -> [int]:
+    """
+    Returns the positions of the set bits of a bitset, in increasing order.
+    For example bits_to_ids(0b10110) returns [1, 2, 4].
+    :param bits: a bitset stored in a (arbitrarily large) integer
+    :return: a list of the word ids in the bitset
+    """
+    ids = []
+    data = bits.to_bytes((bits.bit_length() + 7) // 8, 'little')
+    for byte_index, byte in enumerate(data):
+        if byte:
+            base = byte_index * 8
+            ids.extend(base + bit for bit in _BYTE_BITS[byte])
+
+    return ids
+
+
+class ConstraintIndex:
+    def __init__(self, words_list: [list], letter_bits: Optional[dict] = None, position_bits: Optional[list] = None):
+        """
+        Initializes a ConstraintIndex object, which indexes a word list once so that the gray, yellow and green
+        constraints of find_matched_words resolve as bitset operations. Bit i of every bitset stands for the word
+        with id i, i.e. words_list[i].
+        :param words_list: the list of words to index
+        :param letter_bits: the precomputed per-letter bitsets, e.g. loaded from a WordCache
+        :param position_bits: the precomputed per-(position, letter) bitsets, given together with letter_bits
+        """
+        self.words_list = words_list
+        self.count = 0  # the number of words indexed so far, i.e. the id of the next word
+        self.all_bits = 0
+        self.letter_bits = {}  # letter -> bitset of the words containing the letter
+        self.position_bits = []  # one dictionary per index: letter -> bitset of the words with the letter there
+        if letter_bits is None:
+            self.build()
+        else:
+            self.count = len(words_list)
+            self.all_bits = (1 << self.count) - 1
+            self.letter_bits = letter_bits
+            self.position_bits = position_bits
+
+    def build(self):
+        """
+        Builds the per-letter and per-(position, letter) bitsets of the word list.
+        """
+        self.add_words(self.words_list)
+
+    def add_words(self, words: [list]):
+        """
+        Indexes words appended to the word list, e.g. one chunk of a streamed dictionary at a time. The words get
+        the next ids, so they must be in the same order as in the word list.
+        :param words: the words to index
+        """
+        size = (len(words) + 7) // 8
+        letter_bytes = {}
+        position_bytes = []
+
+        # Set the bits in byte arrays first, which is much cheaper than growing large integers word by word
+        for word_id, word in enumerate(words):
+            byte_index, mask = word_id >> 3, 1 << (word_id & 7)
+            for i, char in enumerate(word):
+                if i == len(position_bytes):
+                    position_bytes.append({})
+                if char not in position_bytes[i]:
+                    position_bytes[i][char] = bytearray(size)
+                position_bytes[i][char][byte_index] |= mask
+                if char not in letter_bytes:
+                    letter_bytes[char] = bytearray(size)
+                letter_bytes[char][byte_index] |= mask
+
+        # Shift the bitsets of the new words past the ids of the words indexed before
+        for char, data in letter_bytes.items():
+            self.letter_bits[char] = self.letter_bits.get(char, 0) | int.from_bytes(data, 'little') << self.count
+        for i, position in enumerate(position_bytes):
+            if i == len(self.position_bits):
+                self.position_bits.append({})
+            for char, data in position.items():
+                self.position_bits[i][char] = (self.position_bits[i].get(char, 0)
+                                               | int.from_bytes(data, 'little') << self.count)
+
+        self.count += len(words)
+        self.all_bits = (1 << self.count) - 1
+
+    def at_positions(self, letter: [str], indices: [set]) -> int:
+        """
+        Returns the bitset of the words which contain the letter at any of the given indices.
+        :param letter: the letter to look for
+        :param indices: a set of 0-based indices
+        :return: a bitset of word ids
+        """
+        bits = 0
+        for i in indices:
+            if 0 <= i < len(self.position_bits):
+                bits |= self.position_bits[i].get(letter, 0)
+
+        return bits
+
+    def at_least(self, letter: [str], count: [int]) -> int:
+        """
+        Returns the bitset of the words which contain the letter at least count times, as the union over every set of
+        count indices of the words having the letter at all of them.
+        :param letter: the letter to look for
+        :param count: the minimum number of occurrences
+        :return: a bitset of word ids
+        """
+        if count <= 0:
+            return self.all_bits
+
+        bits = 0
+        for indices in combinations(range(len(self.position_bits)), count):
+            subset = self.all_bits
+            for i in indices:
+                subset &= self.position_bits[i].get(letter, 0)
+            bits |= subset
+
+        return bits
+
+    def match(self, grays: [str], yellows: {}, greens: {}, candidates: Optional[int] = None,
+              counts: Optional[dict] = None) -> int:
+        """
+        Resolves the constraints of find_matched_words to the bitset of the words satisfying them.
+        :param grays: a list of characters in the form of a string (gray constraint)
+        :param yellows: a dictionary of characters to set of indices (yellow constraint)
+        :param greens: a dictionary of characters to set of indices (green constraint)
+        :param candidates: a bitset to restrict the search to, by default every word of the list
+        :param counts: a dictionary of characters to (minimum, maximum) numbers of occurrences (count constraint)
+        :return: a bitset of the ids of the matched words
+        """
+        matched = self.all_bits if candidates is None else candidates
+
+        # Check gray constraint
+        for gray_letter in grays:
+            matched &= ~self.letter_bits.get(gray_letter, 0)
+
+        # Check yellow constraint: the letter is present, but at none of the given indices
+        for yellow_letter, yellow_indices in yellows.items():
+            matched &= self.letter_bits.get(yellow_letter, 0)
+            matched &= ~self.at_positions(yellow_letter, yellow_indices)
+
+        # Check green constraint: the letter is at every one of the given indices
+        for green_letter, green_indices in greens.items():
+            matched &= self.letter_bits.get(green_letter, 0)
+            for i in green_indices:
+                matched &= self.at_positions(green_letter, {i})
+
+        # Check count constraint
+        for letter, (minimum, maximum) in (counts or {}).items():
+            matched &= self.at_least(letter, minimum)
+            matched &= ~self.at_least(letter, maximum + 1)
+
+        return matched
+
+    def words(self, bits: [int]) -> [str]:
+        """
+        Returns the words of a bitset, in the order of the word list.
+        :param bits: a bitset of word ids
+        :return: a list of words
+        """
+        return [self.words_list[word_id] for word_id in bits_to_ids(bits)]
+
+    def find_matched_words(self, grays: [str], yellows: {}, greens: {}, command: [str],
+                           candidates: Optional[int] = None,
+                           counts: Optional[dict] = None) -> Union[str, List[str], None]:
+        """
+        Indexed equivalent of find_matched_words over the indexed word list.
+        :param grays: a list of characters in the form of a string (gray constraint)
+        :param yellows: a dictionary of characters to set of indices (yellow constraint)
+        :param greens: a dictionary of characters to set of indices (green constraint)
+        :param command: either "word" or "list" to specify the return type
+        :param candidates: a bitset to restrict the search to, by default every word of the list
+        :param counts: a dictionary of characters to (minimum, maximum) numbers of occurrences (count constraint)
+        :return: a word from the given list which satisfies the constraints, or None if none is found
+        """
+        matched = self.match(grays, yellows, greens, candidates, counts)
+
+        if matched:
+            if command == "word":
+                return self.words_list[(matched & -matched).bit_length() - 1]  # the lowest id comes first
+            elif command == "list":
+                return self.words(matched)
+        else:
+            return None
+
+
+class CandidateCache:
+    def __init__(self, max_bytes: [int] = 64 * 1024 * 1024):
+        """
+        Initializes a CandidateCache object, a bounded cache of the candidates left after a feedback history. Games
+        which start with the same guesses and get the same feedback resume from the cached candidates instead of
+        matching the constraints again. The key of an entry is the canonical history, a tuple of (guess, pattern code)
+        pairs, and its value is the bitset of the remaining word ids, as returned by ConstraintIndex.match. When the
+        entries exceed max_bytes, the least recently used ones are evicted.
+        :param max_bytes: the memory cap of the cached keys and bitsets, in bytes
+        """
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()  # history -> (bitset, size in bytes), the least recently used first
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def entry_size(history: [tuple], bits: [int]) -> int:
+        """
+        Returns the approximate memory used by an entry.
+        :param history: the key of the entry
+        :param bits: the bitset of the entry
+        :return: a number of bytes
+        """
+        return sys.getsizeof(history) + sys.getsizeof(bits)
+
+    def get(self, history: [tuple]) -> Optional[int]:
+        """
+        Returns the candidates left after a history, and marks the entry as recently used.
+        :param history: a tuple of (guess, pattern code) pairs
+        :return: a bitset of word ids, or None if the history is not cached
+        """
+        entry = self.entries.get(history)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self.entries.move_to_end(history)
+        return entry[0]
+
+    def put(self, history: [tuple], bits: [int]):
+        """
+        Caches the candidates left after a history, evicting the least recently used entries over the memory cap.
+        An entry larger than the whole cap is not cached.
+        :param history: a tuple of (guess, pattern code) pairs
+        :param bits: a bitset of word ids
+        """
+        size = self.entry_size(history, bits)
+        if size > self.max_bytes:
+            return
+
+        previous = self.entries.pop(history, None)
+        if previous is not None:
+            self.nbytes -= previous[1]
+        self.entries[history] = (bits, size)
+        self.nbytes += size
+
+        while self.nbytes > self.max_bytes:
+            _, (_, evicted_size) = self.entries.popitem(last=False)
+            self.nbytes -= evicted_size
+            self.evictions += 1
+
+    def stats(self) -> dict:
+        """
+        Returns the counters of the cache.
+        :return: a dictionary with the hits, misses, evictions, entries and bytes used
+        """
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                "entries": len(self.entries), "bytes": self.nbytes}
 
-    # Iterate over each pair of corresponding letters in the secret and check_word
-    for secret_letter, check_letter in zip(secret, check_word):
-        if secret_letter == check_letter:
-            list_wordle.append("green")
-        elif check_letter in secret:
-            list_wordle.append("yellow")
-        else:
-            list_wordle.append("gray")
 
-    return list_wordle
+class WordCache:
+    MAGIC = b"WRDC"
+    VERSION = 1
+    # magic, version, source mtime (ns), source size, word count, word length, hash index size, bytes per bitset,
+    # SHA-1 of the source file
+    HEADER = struct.Struct("<4sIqqIIII20s")
+    ALIGNMENT = 8
 
+    def __init__(self, file_with_words_path: [str], word_length: [int], cache_path: Optional[str] = None):
+        """
+        Initializes a WordCache object, a versioned binary file stored next to the word list which holds the packed
+        words and their hash index, the letter frequencies and the constraint bitsets. Loading it maps the file with
+        mmap, so the start-up time does not depend on rebuilding any of this data.
+        The cache is stale when the version differs, or when the size or the content (checked by hash whenever the
+        modification time differs) of the word list has changed.
+        :param file_with_words_path: the path to the file containing words
+        :param word_length: the number of letters of every word
+        :param cache_path: the path of the cache file, by default the word list path with a '.<word_length>.cache'
+            suffix, so that the caches of different word lengths do not overwrite each other
+        """
+        self.file_with_words_path = file_with_words_path
+        self.word_length = word_length
+        self.cache_path = cache_path or file_with_words_path + "." + str(word_length) + ".cache"
+        self.mapping = None
+        self.store = None
+        self.sorter = None
+        self.index = None
+
+    @classmethod
+    def padded(cls, size: [int]) -> int:
+        """
+        Rounds a section size up, so that every section of the file starts at an aligned offset.
+        :param size: the size of the section in bytes
+        :return: the padded size
+        """
+        return (size + cls.ALIGNMENT - 1) // cls.ALIGNMENT * cls.ALIGNMENT
 
-def find_matched_words(words: [str], grays: [str], yellows: {}, greens: {}, command: [str]) -> Union[str, List[str], None]:
-    """
-    Given a list of words and constraints, it returns a suitable word, if it exists, otherwise the constant 'None'.
-    The constraints are:
-    - grays: A list of characters which are known to not exist in the target word
-    - yellows: A dictionary of characters to sets of indices. The keys are characters, and the corresponding values
-        are sets of integers, indicating the indices where it is known that the corresponding character is NOT at.
-    - greens: A dictionary of characters to sets of indices. The keys are characters, and the corresponding values
-        are sets of integers, indicating the indices where it is known that the corresponding character is found at.
-    For example, the call:
-        find_word(['batch', 'ozone'], 'abcd', {'n': {2}, 'z': {2, 3}}, {'o': {0, 2}, 'e': {4}})
-    It looks for a word in the given list so that it does not contain any of the characters 'a', 'b', 'c', 'd'.
-    Also, it contains 'n' but not at index 2, and 'z' but not at indices 2, or 3.
-    Finally, it contains 'o' at indices 0, 2, and it also contains 'e' at index 4.
-    This for example excludes 'batch' but could return 'ozone'.
-    remember that the indices are 0-base which means the first position is index 0, and the last one (5th) is index 4.
-    :param words: the list of words to be checked against the constraints
-    :param grays: a list of characters in the form of a string (gray constraint)
-    :param yellows: a dictionary of characters to set of indices (yellow constraint)
-    :param greens: a dictionary of characters to set of indices (green constraint)
-    :param command: either "word" or "list" to specify the return type
-    :return: a word from the given list which satisfies the constraints, or None if none is found
-    """
-    matched_words = []
+    def source_digest(self) -> bytes:
+        """
+        Returns the SHA-1 hash of the content of the word list file.
+        :return: the 20 bytes of the digest
+        """
+        digest = hashlib.sha1()
+        with open(self.file_with_words_path, 'rb') as file:
+            for block in iter(lambda: file.read(1 << 20), b""):
+                digest.update(block)
 
-    # Check gray constraint
-    for word in words:
-        for gray_letter in grays:
-            if gray_letter in word:
-                break
-        else:
-            # Check yellow constraint
-            for yellow_letter, yellow_indices in yellows.items():
-                if yellow_letter not in word:
-                    break
-                # Find all occurrences of yellow_letter in the word
-                letter_indices = [i for i, char in enumerate(word) if char == yellow_letter]
-                # Check if any occurrence satisfies the constraint
-                if set(letter_indices).intersection(yellow_indices):
-                    break
-            else:
-                # Check green constraint
-                found = True
-                for green_letter, green_indices in greens.items():
-                    if green_letter in word:
-                        # Get all indices of green_letter in the word
-                        letter_indices = [i for i, char in enumerate(word) if char == green_letter]
-                        # Check if all specified indices are covered
-                        if set(letter_indices).intersection(green_indices):
-                            break
-                    else:
-                        found = False
-                        break
-                if found:
-                    matched_words.append(word)
+        return digest.digest()
 
-    if matched_words:
-        if command == "word":
-            return matched_words[0]
-        elif command == "list":
-            return matched_words
-    else:
-        return None
+    def get(self) -> 'WordCache':
+        """
+        Loads the cache, rebuilding it first if it is missing or stale.
+        :return: this WordCache object, with the store, sorter and index attributes set
+        """
+        if not self.load():
+            self.build()
+            self.load()
+
+        return self
+
+    def load(self) -> bool:
+        """
+        Maps the cache file and wraps its sections without copying the words.
+        :return: True if the cache was loaded, False if it is missing or stale
+        """
+        try:
+            with open(self.cache_path, 'rb') as file:
+                mapping = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            source = os.stat(self.file_with_words_path)
+        except (OSError, ValueError):
+            return False
+
+        if len(mapping) < self.HEADER.size:
+            return False
+        magic, version, mtime, size, count, word_length, table_size, bitset_bytes, digest = \
+            self.HEADER.unpack_from(mapping)
+        if magic != self.MAGIC or version != self.VERSION or word_length != self.word_length or size != source.st_size:
+            return False
+        if mtime != source.st_mtime_ns and digest != self.source_digest():
+            return False
+
+        view = memoryview(mapping)
+        offset = self.padded(self.HEADER.size)
+        sections = []
+        for section_size in (count * word_length, table_size * 4, 26 * 4, word_length * 26 * 4,
+                             26 * bitset_bytes, word_length * 26 * bitset_bytes):
+            sections.append(view[offset:offset + section_size])
+            offset += self.padded(section_size)
+        if offset > len(mapping):  # A truncated file
+            return False
+        records, table, counts, positional, letter_section, position_section = sections
+
+        self.mapping = mapping
+        self.store = WordStore(word_length, records, table.cast('i'), count)
+
+        counts = counts.cast('I').tolist()
+        positional = positional.cast('I').tolist()
+        self.sorter = FrequencySorter(self.store, counts,
+                                      [positional[i * 26:(i + 1) * 26] for i in range(word_length)])
+
+        letter_bits = {}
+        position_bits = [{} for _ in range(word_length)]
+        for letter, char in enumerate(FrequencySorter.ALPHABET):
+            start = letter * bitset_bytes
+            bits = int.from_bytes(letter_section[start:start + bitset_bytes], 'little')
+            if bits:
+                letter_bits[char] = bits
+            for i in range(word_length):
+                start = (i * 26 + letter) * bitset_bytes
+                bits = int.from_bytes(position_section[start:start + bitset_bytes], 'little')
+                if bits:
+                    position_bits[i][char] = bits
+        self.index = ConstraintIndex(self.store, letter_bits, position_bits)
+
+        return True
+
+    def build(self):
+        """
+        Reads the word list, derives the hash index, letter frequencies and constraint bitsets, and writes them to
+        the cache file.
+        """
+        store, sorter, index = FileHandler(self.file_with_words_path, []).get_indexed_words(self.word_length)
+        source = os.stat(self.file_with_words_path)
+        bitset_bytes = (len(store) + 7) // 8
+
+        positional = []
+        for i in range(self.word_length):
+            positional.extend(sorter.positional_counts[i] if i < len(sorter.positional_counts) else [0] * 26)
+        letter_section = b"".join(index.letter_bits.get(char, 0).to_bytes(bitset_bytes, 'little')
+                                  for char in FrequencySorter.ALPHABET)
+        position_section = b"".join(
+            (index.position_bits[i].get(char, 0) if i < len(index.position_bits) else 0).to_bytes(bitset_bytes,
+                                                                                                  'little')
+            for i in range(self.word_length) for char in FrequencySorter.ALPHABET)
+
+        header = self.HEADER.pack(self.MAGIC, self.VERSION, source.st_mtime_ns, source.st_size, len(store),
+                                  self.word_length, len(store.table), bitset_bytes, self.source_digest())
+        sections = [header, bytes(store.buffer), store.table.tobytes(), array('I', sorter.counts).tobytes(),
+                    array('I', positional).tobytes(), letter_section, position_section]
+
+        def write(file):
+            for section in sections:
+                file.write(section)
+                file.write(bytes(self.padded(len(section)) - len(section)))
+
+        # Write to a temporary file first, so that a concurrent reader never maps a partial cache
+        atomic_write(self.cache_path, write)
 
 
 class WordValidator:
@@ -255,33 +2259,300 @@ class WordValidator:
             # If none of the above conditions are met, return None (indicating no error) and False flag
             return None, False
 
-    def get_user_guess(self) -> tuple[str, bool]:
+
+class PhaseTimer:
+    __slots__ = ("metrics", "name", "start")
+
+    def __init__(self, metrics: 'Metrics', name: [str]):
         """
-        Get a user guess input, validate, and return the guess.
-        :return: A tuple containing the user guess and a boolean indicating if the guess is incorrect.
+        Initializes a PhaseTimer object, a context manager which adds the time spent in its block to a phase.
+        :param metrics: the metrics to record the time in
+        :param name: the name of the phase
         """
-        while True:  # continue looping until you get a valid guess
-            guess_input = input("Enter a 5-letter word: ")
+        self.metrics = metrics
+        self.name = name
+        self.start = 0.0
 
-            if guess_input.lower() == 'quit' or guess_input.lower() == 'q':  # if the guess input is 'quit'
-                print("Thank you for playing Wordle! Bye!")
-                quit()  # then quit the game
+    def __enter__(self):
+        self.start = perf_counter()
+        return self
 
-            # here we overwrite guess with the filtered guess
-            error, incorrect = self.validate(guess_input)
+    def __exit__(self, *exc_info):
+        self.metrics.add_time(self.name, perf_counter() - self.start)
+        return False
 
-            if error is not None:  # if the guess input is correct
-                print(error)  # show the input error to the user, as appropriate
-                continue  # then stop looping
-            else:
-                break
 
-        return guess_input, incorrect  # return the guess input to the main program
+# The context manager of the phases when no metrics are recorded, shared so that disabled instrumentation is cheap
+NO_PHASE = nullcontext()
+
+
+class Metrics:
+    FORMATS = ("json", "prometheus")
+
+    def __init__(self, dump_path: Optional[str] = None, dump_format: [str] = "json", dump_interval: [float] = 10.0):
+        """
+        Initializes a Metrics object, the opt-in instrumentation of the game modes. It records:
+        - the number of calls and the total and maximum time of every phase (e.g. "filtering", "selection",
+          "scoring", "validation")
+        - the number of candidates left after every turn of the autoplay games
+        - named call counters (e.g. "games", "guesses")
+        Code paths are instrumented through GameMode.phase, which costs one shared no-op context when no Metrics
+        object is given.
+        :param dump_path: the local file the metrics are dumped to by dump and maybe_dump, or None to never dump
+        :param dump_format: the format of the dumps, "json" or "prometheus" (the Prometheus text exposition format)
+        :param dump_interval: the minimum number of seconds between two dumps of maybe_dump
+        """
+        if dump_format not in self.FORMATS:
+            raise ValueError("Unknown metrics format: " + str(dump_format))
+        self.dump_path = dump_path
+        self.dump_format = dump_format
+        self.dump_interval = dump_interval
+        self.last_dump = perf_counter()
+        self.phases = {}  # phase -> [calls, total seconds, maximum seconds]
+        self.counters = {}  # name -> count
+        self.candidates = {}  # turn -> [games, total candidates, maximum candidates]
+
+    def phase(self, name: [str]) -> PhaseTimer:
+        """
+        Returns a context manager which times its block as one call of a phase.
+        :param name: the name of the phase
+        :return: the PhaseTimer object
+        """
+        return PhaseTimer(self, name)
+
+    def add_time(self, name: [str], seconds: [float]):
+        """
+        Records one call of a phase.
+        :param name: the name of the phase
+        :param seconds: the time the call took
+        """
+        phase = self.phases.get(name)
+        if phase is None:
+            self.phases[name] = [1, seconds, seconds]
+        else:
+            phase[0] += 1
+            phase[1] += seconds
+            if seconds > phase[2]:
+                phase[2] = seconds
+
+    def count(self, name: [str], step: [int] = 1):
+        """
+        Increments a named counter.
+        :param name: the name of the counter
+        :param step: the amount to add
+        """
+        self.counters[name] = self.counters.get(name, 0) + step
+
+    def add_candidates(self, turn: [int], size: [int]):
+        """
+        Records the number of candidates left after a turn of a game.
+        :param turn: the number of the turn, from 1
+        :param size: the number of remaining candidates
+        """
+        stats = self.candidates.get(turn)
+        if stats is None:
+            self.candidates[turn] = [1, size, size]
+        else:
+            stats[0] += 1
+            stats[1] += size
+            if size > stats[2]:
+                stats[2] = size
+
+    def snapshot(self) -> dict:
+        """
+        Returns the metrics recorded so far.
+        :return: a dictionary of the phases, counters and candidate-set sizes per turn
+        """
+        return {
+            "phases": {name: {"calls": calls, "seconds": total, "mean_seconds": total / calls, "max_seconds": maximum}
+                       for name, (calls, total, maximum) in sorted(self.phases.items())},
+            "counters": dict(sorted(self.counters.items())),
+            "candidates": {str(turn): {"games": games, "mean": total / games, "max": maximum}
+                           for turn, (games, total, maximum) in sorted(self.candidates.items())},
+        }
+
+    def to_prometheus(self) -> str:
+        """
+        Formats the metrics in the Prometheus text exposition format.
+        :return: the text of the metrics
+        """
+        lines = ["# TYPE wordle_phase_calls_total counter"]
+        lines += ['wordle_phase_calls_total{phase="' + name + '"} ' + str(calls)
+                  for name, (calls, _, _) in sorted(self.phases.items())]
+        lines.append("# TYPE wordle_phase_seconds_total counter")
+        lines += ['wordle_phase_seconds_total{phase="' + name + '"} ' + repr(total)
+                  for name, (_, total, _) in sorted(self.phases.items())]
+        lines.append("# TYPE wordle_phase_max_seconds gauge")
+        lines += ['wordle_phase_max_seconds{phase="' + name + '"} ' + repr(maximum)
+                  for name, (_, _, maximum) in sorted(self.phases.items())]
+        lines.append("# TYPE wordle_calls_total counter")
+        lines += ['wordle_calls_total{name="' + name + '"} ' + str(count)
+                  for name, count in sorted(self.counters.items())]
+        lines.append("# TYPE wordle_candidates summary")
+        for turn, (games, total, _) in sorted(self.candidates.items()):
+            lines.append('wordle_candidates_sum{turn="' + str(turn) + '"} ' + str(total))
+            lines.append('wordle_candidates_count{turn="' + str(turn) + '"} ' + str(games))
+        lines.append("# TYPE wordle_candidates_max gauge")
+        lines += ['wordle_candidates_max{turn="' + str(turn) + '"} ' + str(maximum)
+                  for turn, (_, _, maximum) in sorted(self.candidates.items())]
+
+        return "\n".join(lines) + "\n"
+
+    def dump(self, path: Optional[str] = None) -> str:
+        """
+        Writes the metrics to a local file, replacing it atomically so that a reader never sees a partial dump.
+        :param path: the file to write, by default dump_path
+        :return: the path the metrics were written to
+        """
+        path = path or self.dump_path
+        if self.dump_format == "prometheus":
+            text = self.to_prometheus()
+        else:
+            text = json.dumps(self.snapshot(), indent=2) + "\n"
+
+        atomic_write(path, lambda file: file.write(text.encode("utf-8")))
+        self.last_dump = perf_counter()
+
+        return path
+
+    def maybe_dump(self):
+        """
+        Dumps the metrics to dump_path if one is set and dump_interval seconds have passed since the last dump.
+        """
+        if self.dump_path is not None and perf_counter() - self.last_dump >= self.dump_interval:
+            self.dump()
+
+
+def timed_phase(metrics: Optional[Metrics], name: [str]):
+    """
+    Returns a context manager which times its block as a phase of the metrics, or does nothing without metrics.
+    :param metrics: the Metrics object, or None when the code is not instrumented
+    :param name: the name of the phase
+    :return: a context manager
+    """
+    return NO_PHASE if metrics is None else metrics.phase(name)
+
+
+def percentile(sorted_values: [list], fraction: [float]) -> float:
+    """
+    Returns the given percentile of a sorted list of values, using the nearest-rank method.
+    :param sorted_values: the values, sorted in increasing order
+    :param fraction: the percentile as a fraction, e.g. 0.99 for the 99th percentile
+    :return: the value at that percentile
+    """
+    rank = max(0, min(len(sorted_values) - 1, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+class GameSession:
+    __slots__ = ("words_list", "word_length", "validator", "max_guesses", "rng", "metrics", "secret", "guesses",
+                 "status")
+
+    def __init__(self, words_list: [list], secret: Optional[str] = None, validator: Optional[WordValidator] = None,
+                 max_guesses: Optional[int] = None, rng: Optional[Random] = None, metrics: Optional[Metrics] = None):
+        """
+        Initializes a GameSession object, the state of one game without any terminal input or output, and starts the
+        game. A game is played one step at a time with submit_guess, so many sessions can be driven from a loop,
+        threads or an event loop; the game modes are terminal front-ends over it.
+        :param words_list: the list (or WordStore) of accepted words, which the secret word is picked from
+        :param secret: the secret word, by default a random word of the list
+        :param validator: the validator of the guesses, shared between sessions, by default a new one for the list
+        :param max_guesses: the number of guesses after which the game is lost, or None for no limit
+        :param rng: the random number generator of the secret words, by default the shared one of the random module
+        :param metrics: the Metrics object to record the validation and scoring of the guesses in, if any
+        """
+        self.words_list = words_list
+        self.word_length = len(words_list[0]) if len(words_list) else 0
+        self.validator = validator or WordValidator(words_list, self.word_length)
+        self.max_guesses = max_guesses
+        self.rng = rng
+        self.metrics = metrics
+        self.new_game(secret)
+
+    def new_game(self, secret: Optional[str] = None) -> 'GameSession':
+        """
+        Starts a new game in the session, forgetting the previous one.
+        :param secret: the secret word, by default a random word of the list
+        :return: the session itself
+        """
+        if secret is None:
+            secret = choice(self.words_list) if self.rng is None else self.rng.choice(self.words_list)
+        self.secret = secret
+        self.guesses = []  # list of (guess, pattern code)
+        self.status = "PLAYING"
+
+        return self
+
+    def submit_guess(self, guess_word: [str]) -> tuple:
+        """
+        Validates and scores a guess, and updates the state of the game.
+        :param guess_word: the word guessed by the player
+        :return: a tuple of None and the list of 'gray', 'yellow', 'green' values of the guess, or of an error message
+            and None if the guess is not accepted (the game is then unchanged)
+        """
+        if self.status != "PLAYING":
+            return "The game is over, start a new one!", None
+        with timed_phase(self.metrics, "validation"):
+            error, incorrect = self.validator.validate(guess_word)
+        if error is not None:
+            return error, None
+
+        guess_word = guess_word.lower()
+        with timed_phase(self.metrics, "scoring"):
+            code = score(self.secret, guess_word)
+            result = decode_pattern(code, self.word_length)
+        self.guesses.append((guess_word, code))
+
+        if guess_word == self.secret:
+            self.status = "WON"
+        elif self.max_guesses is not None and len(self.guesses) >= self.max_guesses:
+            self.status = "LOST"
+
+        return None, result
+
+    def constraints(self) -> tuple:
+        """
+        Returns the constraints learned from the guesses so far, computed on demand so that submit_guess stays cheap.
+        :return: a tuple of the grays, yellows, greens and counts, in the form expected by find_matched_words
+        """
+        grays, yellows, greens, counts = [], {}, {}, {}
+        for guess, code in self.guesses:
+            update_constraints(guess, decode_pattern(code, self.word_length), grays, yellows, greens, counts)
+
+        return grays, yellows, greens, counts
+
+    def snapshot(self) -> dict:
+        """
+        Returns the state of the game, e.g. to render it or to send it to a client. The secret word is only revealed
+        once the game is over.
+        :return: a dictionary with the status, the guesses and their results, and the number of guesses left
+        """
+        return {
+            "status": self.status,
+            "guesses": [(guess, decode_pattern(code, self.word_length)) for guess, code in self.guesses],
+            "num_of_guesses": len(self.guesses),
+            "guesses_left": None if self.max_guesses is None else self.max_guesses - len(self.guesses),
+            "secret": None if self.status == "PLAYING" else self.secret,
+        }
 
 
 class GameMode(ABC):
-    def __init__(self, words_list: [list]):
+    def __init__(self, words_list: [list], metrics: Optional[Metrics] = None):
+        """
+        Initialize the GameMode object.
+        :param words_list: A list of words for the game.
+        :param metrics: The Metrics object to record the phases of the games in, or None to not instrument them.
+        """
         self.words_list = words_list
+        self.metrics = metrics
+
+    def phase(self, name: [str]):
+        """
+        Returns a context manager which times its block as a phase of the metrics, or does nothing without metrics.
+        :param name: the name of the phase
+        :return: a context manager
+        """
+        return timed_phase(self.metrics, name)
 
     @abstractmethod
     def execute(self, wordle_game: 'WordleGame', random_word: [str]):
@@ -289,6 +2560,297 @@ class GameMode(ABC):
 
 
 class AutoplayMode(GameMode):
+    STRATEGIES = ("random", "frequency", "entropy", "tree")
+
+    def __init__(self, words_list: [list], strategy: [str] = "random", index: Optional[ConstraintIndex] = None,
+                 sorter: Optional[FrequencySorter] = None, cache: Optional[CandidateCache] = None,
+                 metrics: Optional[Metrics] = None, opening_metric: [str] = "entropy"):
+        """
+        Initialize the AutoplayMode object.
+        :param words_list: A list of words for the game.
+        :param strategy: How the computer picks its guesses:
+            - "random" starts with a word containing the five most frequent letters, then picks random matching words
+            - "frequency" picks the matching word made of the most frequent letters among the remaining candidates
+            - "entropy" picks the guess which maximizes the expected information of the feedback
+            - "tree" looks the next guess up in the precomputed DecisionTree (built on first use, see solver_tree.py)
+        :param index: A prebuilt ConstraintIndex of the words, built from the words when not given.
+        :param sorter: A prebuilt FrequencySorter of the words, built from the words when not given.
+        :param cache: The CandidateCache shared by the games of the "random" and "frequency" strategies, a new one with
+            the default memory cap when not given.
+        :param metrics: The Metrics object to record the phases and candidate-set sizes of the games in, if any.
+        :param opening_metric: The metric ('entropy', 'expected' or 'worst') by which the "random" and "frequency"
+            strategies pick their first guess from the OpeningTable, when one was built by openers.py.
+        """
+        super().__init__(words_list, metrics)
+        if strategy not in self.STRATEGIES:
+            raise ValueError("Unknown autoplay strategy: " + str(strategy))
+        if opening_metric not in OpeningTable.METRICS:
+            raise ValueError("Unknown opener metric: " + str(opening_metric))
+        if strategy in ("entropy", "tree") and np is None:
+            raise RuntimeError("The " + strategy + " strategy requires NumPy to be installed.")
+        if strategy == "tree" and len(words_list) > MATRIX_MAX_WORDS:
+            raise ValueError("The tree strategy is limited to lists of " + str(MATRIX_MAX_WORDS) + " words.")
+        self.strategy = strategy
+        self.index = index or ConstraintIndex(words_list)
+        self.sorter = sorter or FrequencySorter(words_list)
+        self.cache = cache if cache is not None else CandidateCache()
+        self.engine = None
+        self.tree = None
+        self.opening_metric = opening_metric
+        self.table_opening = None
+        self.opening_words = None
+        self.frequency_opening = None
+
+    def get_table_opening(self) -> Optional[str]:
+        """
+        Returns the best opener of the OpeningTable cached on disk, which is looked up once.
+        :return: the opening word, or None if NumPy is missing or no table was built for the word list
+        """
+        if self.table_opening is None:
+            table = OpeningTable.load(self.words_list) if np is not None else None
+            self.table_opening = table.best(self.opening_metric) if table is not None else ""
+
+        return self.table_opening or None
+
+    def get_opening_words(self) -> [list]:
+        """
+        Returns the words the computer picks its first guess from: the best opener of the OpeningTable if there is
+        one, otherwise the words containing the five most frequent letters (or as many of them as some word contains).
+        :return: a list of words
+        """
+        if self.opening_words is None and self.get_table_opening():
+            self.opening_words = [self.table_opening]
+        if self.opening_words is None:
+            top_five = self.sorter.sort_frequencies("returntopfive")
+            # Drop the least frequent of the letters until some word contains all of them
+            for count in range(len(top_five), 0, -1):
+                self.opening_words = find_words_with_letters(self.words_list, top_five[:count])
+                if self.opening_words:
+                    break
+            else:
+                self.opening_words = list(self.words_list)
+
+        return self.opening_words
+
+    def solve(self, random_word: [str], rng: Optional[Random] = None):
+        """
+        Let the computer guess the secret word, without any terminal output or delay.
+        Each step yields the guess and its result, until the secret word is found or no suitable word is left.
+        :param random_word: The secret word chosen for the game.
+        :param rng: A random number generator for reproducible games, by default the shared one of the random module.
+        :return: A generator of (guess, list of 'gray', 'yellow', 'green') tuples.
+        """
+        if self.metrics is not None:
+            self.metrics.count("games")
+        if self.strategy == "entropy":
+            return self.solve_entropy(random_word)
+        elif self.strategy == "tree":
+            return self.solve_tree(random_word)
+        elif self.strategy == "frequency":
+            return self.solve_frequency(random_word)
+        return self.solve_random(random_word, rng)
+
+    def narrow(self, history: [tuple], grays: [list], yellows: {}, greens: {}, counts: {}, candidates: [int]) -> int:
+        """
+        Returns the candidates left after a feedback history, from the cache when another game already followed the
+        same history, otherwise by matching the constraints against the candidates of the previous turn.
+        :param history: the (guess, pattern code) pairs of the game so far
+        :param grays: the gray constraint learned from the history
+        :param yellows: the yellow constraint learned from the history
+        :param greens: the green constraint learned from the history
+        :param counts: the count constraint learned from the history
+        :param candidates: the bitset of the candidates before the last guess of the history
+        :return: a bitset of the remaining word ids
+        """
+        remaining = self.cache.get(history)
+        if remaining is None:
+            remaining = self.index.match(grays, yellows, greens, candidates, counts)
+            self.cache.put(history, remaining)
+
+        return remaining
+
+    def record_candidates(self, turn: [int], size: [int]):
+        """
+        Records the number of candidates left after a turn, when the games are instrumented.
+        :param turn: the number of the turn, from 1
+        :param size: the number of remaining candidates
+        """
+        if self.metrics is not None:
+            self.metrics.add_candidates(turn, size)
+
+    def solve_random(self, random_word: [str], rng: Optional[Random] = None):
+        """
+        The "random" strategy of solve.
+        :param random_word: The secret word chosen for the game.
+        :param rng: A random number generator for reproducible games, by default the shared one of the random module.
+        :return: A generator of (guess, list of 'gray', 'yellow', 'green') tuples.
+        """
+        pick = choice if rng is None else rng.choice
+        all_words = self.index.all_bits
+        random_cpu_choice = pick(self.get_opening_words())
+        yellow_chars, green_chars, count_chars = {}, {}, {}
+        grays_chars = []
+        history = ()
+
+        while True:
+            # compare the guess against the game word
+            with self.phase("scoring"):
+                code = score(random_word, random_cpu_choice)
+                result = decode_pattern(code, len(random_cpu_choice))
+            yield random_cpu_choice, result
+
+            if random_word == random_cpu_choice:  # if the secret word is the same with the computers random word
+                return
+
+            with self.phase("filtering"):
+                update_constraints(random_cpu_choice, result, grays_chars, yellow_chars, green_chars, count_chars)
+                history += ((random_cpu_choice, code),)
+                all_words = self.narrow(history, grays_chars, yellow_chars, green_chars, count_chars, all_words)
+            if self.metrics is not None:
+                self.record_candidates(len(history), all_words.bit_count())
+
+            if not all_words:
+                return
+
+            # computer chooses a random world from the list
+            with self.phase("selection"):
+                random_cpu_choice = pick(self.index.words(all_words))
+
+    def solve_frequency(self, random_word: [str]):
+        """
+        The "frequency" strategy of solve. The letter counts of the remaining candidates are updated as candidates
+        are pruned, and every turn the candidate with the highest frequency score is guessed.
+        :param random_word: The secret word chosen for the game.
+        :return: A generator of (guess, list of 'gray', 'yellow', 'green') tuples.
+        """
+        sorter = self.sorter.copy()
+        if self.frequency_opening is None:
+            self.frequency_opening = self.get_table_opening() or max(self.words_list, key=sorter.word_score)
+        all_words = self.index.all_bits
+        guess = self.frequency_opening
+        yellow_chars, green_chars, count_chars = {}, {}, {}
+        grays_chars = []
+        history = ()
+
+        while True:
+            with self.phase("scoring"):
+                code = score(random_word, guess)
+                result = decode_pattern(code, len(guess))
+            yield guess, result
+
+            if random_word == guess:
+                return
+
+            with self.phase("filtering"):
+                update_constraints(guess, result, grays_chars, yellow_chars, green_chars, count_chars)
+                history += ((guess, code),)
+                remaining = self.narrow(history, grays_chars, yellow_chars, green_chars, count_chars, all_words)
+                candidates = self.index.words(remaining)
+            self.record_candidates(len(history), len(candidates))
+
+            with self.phase("selection"):
+                # Subtract the pruned words, unless counting the remaining ones from scratch is cheaper
+                if len(candidates) < (all_words & ~remaining).bit_count():
+                    sorter.reset(candidates)
+                else:
+                    sorter.remove_words(self.index.words(all_words & ~remaining))
+                all_words = remaining
+
+                if not all_words:
+                    return
+                guess = max(candidates, key=sorter.word_score)
+
+    def get_engine(self) -> FeedbackEngine:
+        """
+        Returns the feedback engine of the words, with its pattern matrix loaded unless the list is too large for it.
+        :return: the FeedbackEngine object
+        """
+        if self.engine is None:
+            self.engine = FeedbackEngine(self.words_list)
+            self.engine.use_matrix()
+
+        return self.engine
+
+    def get_tree(self) -> DecisionTree:
+        """
+        Returns the decision tree of the words, mapped from CACHE_DIR or built (in this process) and cached.
+        :return: the DecisionTree object
+        """
+        if self.tree is None:
+            self.tree = DecisionTree.load(self.words_list)
+            if self.tree is None:
+                self.tree = DecisionTree.build(self.get_engine())
+                self.tree.save()
+
+        return self.tree
+
+    def solve_tree(self, random_word: [str]):
+        """
+        The "tree" strategy of solve: every turn follows the edge of the feedback to the next precomputed guess.
+        :param random_word: The secret word chosen for the game.
+        :return: A generator of (guess, list of 'gray', 'yellow', 'green') tuples.
+        """
+        tree = self.get_tree()
+        node = tree.ROOT
+
+        while node >= 0:
+            guess = self.words_list[tree.guess(node)]
+            with self.phase("scoring"):
+                code = score(random_word, guess)
+                result = decode_pattern(code, len(guess))
+            yield guess, result
+
+            if random_word == guess:
+                return
+            with self.phase("selection"):
+                node = tree.child(node, code)
+
+    def solve_entropy(self, random_word: [str]):
+        """
+        The "entropy" strategy of solve. The candidates are the words which would have given the same feedback as
+        the secret word to every guess so far.
+        :param random_word: The secret word chosen for the game.
+        :return: A generator of (guess, list of 'gray', 'yellow', 'green') tuples.
+        """
+        engine = self.get_engine()
+        candidates = np.arange(len(self.words_list))
+        guess_id = engine.best_opening()
+
+        turn = 0
+
+        while True:
+            guess = self.words_list[guess_id]
+            with self.phase("scoring"):
+                code = score(random_word, guess)
+                result = decode_pattern(code, len(guess))
+            yield guess, result
+
+            if random_word == guess:
+                return
+
+            turn += 1
+            with self.phase("filtering"):
+                candidates = candidates[engine.patterns(guess_id, candidates) == code]
+            self.record_candidates(turn, len(candidates))
+            if not len(candidates):
+                return
+            with self.phase("selection"):
+                guess_id = engine.best_guess(candidates)
+
+    def play(self, session: [GameSession], rng: Optional[Random] = None) -> GameSession:
+        """
+        Plays the game of a session with the solver's guesses, without any terminal output or delay.
+        :param session: the session, whose game is in progress
+        :param rng: A random number generator for reproducible games, by default the shared one of the random module.
+        :return: the session, whose game is over unless the solver ran out of suitable words
+        """
+        for guess, _ in self.solve(session.secret, rng):
+            session.submit_guess(guess)
+            if session.status != "PLAYING":
+                break
+
+        return session
+
     def execute(self, wordle_game: 'WordleGame', random_word: [str]):
         """
         Start the Wordle game in autoplay mode.
@@ -297,58 +2859,22 @@ class AutoplayMode(GameMode):
         """
         print("Worldle running in autoplay mode!")
         print("~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~")
-        num_of_guesses = 0
-        all_words = self.words_list
-        s_words = find_words_with_letters(self.words_list, sorter.sort_frequencies("returntopfive"))
-        random_cpu_choice = choice(s_words)
-        yellow_chars, green_chars = {}, {}
-        grays_chars = []
-        added_letters = set()  # Set to keep track of added letters
+        # The solver times its own scoring, so the session is not instrumented
+        session = GameSession(self.words_list, random_word, wordle_game.validator)
 
-        while True:
+        for random_cpu_choice, _ in self.solve(random_word):
+            if session.guesses:
+                print()
             sleep(1)  # we give some to the computer to choose a random word for the text file "wordles.txt"
             print("Trying: " + random_cpu_choice)
-            num_of_guesses += 1
+            _, result = session.submit_guess(random_cpu_choice)
             # display the guess when compared against the game word
-            result = check(random_word, random_cpu_choice)
             print("-> " + str(result))
 
-            if random_word == random_cpu_choice:  # if the secret word is the same with the computers random word
-                print("found in " + str(num_of_guesses) + " tries\n")
-                break  # the program will start over again
-
-            # Iterate over each character and its corresponding color
-            for i, colour in enumerate(result):
-                if colour == "gray":
-                    letter = random_cpu_choice[i]
-                    if letter not in added_letters:  # Check if letter has already been added
-                        grays_chars.append(letter)  # Append letter to grays_chars list
-                        added_letters.add(letter)  # Add letter to set of added letters
-
-            # a list of characters which are known to not exist in the target word
-            for i, colour in enumerate(result):
-                if colour == "yellow":
-                    letter = random_cpu_choice[i]
-                    if letter in yellow_chars:
-                        yellow_chars[letter].add(i)
-                    else:
-                        yellow_chars[letter] = {i}
-                elif colour == "green":
-                    letter = random_cpu_choice[i]
-                    if letter in green_chars:
-                        green_chars[letter].add(i)
-                    else:
-                        green_chars[letter] = {i}
-
-            all_words = find_matched_words(all_words, grays_chars, yellow_chars, green_chars, "list")
-
-            if not all_words:
-                print("No suitable words found. Exiting game.")
-                break
-
-            print()
-            # computer chooses a random world from the list
-            random_cpu_choice = choice(all_words)
+        if session.status == "WON":
+            print("found in " + str(len(session.guesses)) + " tries\n")  # the program will start over again
+        else:
+            print("No suitable words found. Exiting game.")
 
 
 class InteractiveMode(GameMode):
@@ -360,17 +2886,25 @@ class InteractiveMode(GameMode):
         """
         print("Challenge accepted! Can you guess the Secret Word?    [type \"quit\" or \"q\" to Quit]")
         print("~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~")
-        num_of_guesses = 0
+        session = wordle_game.new_session(random_word)
 
         while True:
-            guess, incorrect = validator.get_user_guess()
+            guess_input = input("Enter a " + str(session.word_length) + "-letter word: ")
+
+            if guess_input.lower() == 'quit' or guess_input.lower() == 'q':  # if the guess input is 'quit'
+                print("Thank you for playing Wordle! Bye!")
+                quit()  # then quit the game
 
-            if not incorrect:  # if the guess input was correct
-                num_of_guesses += 1
-                # then display the number of guesses and the list of parses
-                print(str(num_of_guesses) + " -> " + str(check(random_word, guess)))
+            error, result = session.submit_guess(guess_input)
+            if error is not None:  # show the input error to the user, as appropriate
+                print(error)
+                continue
 
-            if random_word == guess:  # if the secret word is the same with the guess word
+            num_of_guesses = len(session.guesses)
+            # then display the number of guesses and the list of parses
+            print(str(num_of_guesses) + " -> " + str(result))
+
+            if session.status == "WON":  # if the secret word is the same with the guess word
                 if num_of_guesses == 1:  # if the number of guess equals to 1
                     print("Lucky or Genius! You found the wordle in just " + str(num_of_guesses) + " try!!!\n")
                 else:
@@ -390,7 +2924,7 @@ class DemonstrationMode(GameMode):
         :param random_word: The secret word chosen for demonstration purposes.
         """
         print("~~~~~~~~~~~~~~~~~~~~")
-        sorter.sort_frequencies("print")
+        wordle_game.sorter.sort_frequencies("print")
         print()
         print(find_words_with_letters(['and', 'din', 'aid', 'dan'], ['a', 'd', 'n']))
         print(find_words_with_letters(self.words_list, ['s', 'e', 'a', 'o', 'r']))
@@ -406,19 +2940,82 @@ class DemonstrationMode(GameMode):
         print()
 
 
+class MultiBoardMode(GameMode):
+    def __init__(self, words_list: [list], boards: [int] = 4, metrics: Optional[Metrics] = None):
+        """
+        Initialize the MultiBoardMode object.
+        :param words_list: A list of words for the game.
+        :param boards: The number of secret words solved at once.
+        :param metrics: The Metrics object to record the phases of the games in, if any.
+        """
+        super().__init__(words_list, metrics)
+        self.boards = boards
+        self.solver = None
+
+    def execute(self, wordle_game: 'WordleGame', random_word: [str]):
+        """
+        Let the computer solve several secret words at once, the first one being the secret word of the game.
+        :param wordle_game: An instance of the WordleGame class to manage game state and provide feedback.
+        :param random_word: The secret word chosen for the game.
+        """
+        if np is None:
+            print("The multi-board mode needs NumPy.\n")
+            return
+        if self.solver is None:
+            self.solver = MultiBoardSolver(self.words_list)
+        secrets = [random_word]
+        while len(secrets) < min(self.boards, len(self.words_list)):
+            secret = choice(self.words_list)
+            if secret not in secrets:
+                secrets.append(secret)
+
+        print("Worldle running in multi-board mode with " + str(len(secrets)) + " boards!")
+        print("~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~")
+        num_of_guesses = 0
+        with self.phase("selection"):
+            steps = list(self.solver.solve(secrets))
+
+        for num_of_guesses, (guess, results) in enumerate(steps, 1):
+            sleep(1)  # as in the autoplay mode, the guesses are shown one at a time
+            print("Trying: " + guess)
+            for board, result in enumerate(results, 1):
+                if result is not None:
+                    print("  board " + str(board) + " -> " + str(result))
+
+        print("found " + ", ".join(secrets) + " in " + str(num_of_guesses) + " tries\n")
+
+
 class WordleGame:
-    def __init__(self, words_list: [list]):
+    def __init__(self, words_list: [list], index: Optional[ConstraintIndex] = None,
+                 sorter: Optional[FrequencySorter] = None, metrics: Optional[Metrics] = None,
+                 strategy: [str] = "random"):
         """
         Initialize the WordleGame object.
         :param words_list: A list of words for the game.
+        :param index: A prebuilt ConstraintIndex of the words, e.g. loaded from a WordCache.
+        :param sorter: A prebuilt FrequencySorter of the words, e.g. loaded from a WordCache.
+        :param metrics: The Metrics object shared by the game modes, dumped after every game, if any.
+        :param strategy: How the computer picks its guesses in the auto game, one of AutoplayMode.STRATEGIES.
         """
         self.words_list = words_list
+        self.metrics = metrics
+        self.sorter = sorter or FrequencySorter(words_list)
+        self.validator = WordValidator(words_list, len(words_list[0]) if len(words_list) else 0)
         self.modes = {
-            '1': AutoplayMode(self.words_list),
-            '2': InteractiveMode(self.words_list),
-            '3': DemonstrationMode(self.words_list)
+            '1': AutoplayMode(self.words_list, strategy, index=index, sorter=self.sorter, metrics=metrics),
+            '2': InteractiveMode(self.words_list, metrics),
+            '3': DemonstrationMode(self.words_list, metrics),
+            '4': MultiBoardMode(self.words_list, metrics=metrics)
         }
 
+    def new_session(self, secret: Optional[str] = None) -> GameSession:
+        """
+        Starts a game over the words of this game, sharing its validator and metrics.
+        :param secret: the secret word, by default a random word of the list
+        :return: the GameSession object
+        """
+        return GameSession(self.words_list, secret, self.validator, metrics=self.metrics)
+
     def main_game(self):
         """
         Start the main Wordle game loop.
@@ -434,7 +3031,8 @@ class WordleGame:
                 # in the input terminal.
                 print("Type:\n\"1\" for auto game,\n"
                       "\"2\" for interactive game,\n"
-                      "\"3\" for wordle functions demonstration or\n"
+                      "\"3\" for wordle functions demonstration,\n"
+                      "\"4\" for multi-board auto game (4 secret words) or\n"
                       "\"Quit\" or \"q\" to exit")
                 start_input = input('Enter your choice: ').lower()
                 if start_input in ["quit", "q"]:  # if the input is 'quit'
@@ -442,25 +3040,70 @@ class WordleGame:
                     quit()
                 mode = self.modes.get(start_input)
                 if mode:
-                    mode.execute(self, random_word)
+                    if self.metrics is None:
+                        mode.execute(self, random_word)
+                    else:
+                        self.metrics.count("mode_" + start_input)
+                        with self.metrics.phase("game"):
+                            mode.execute(self, random_word)
+                        self.metrics.maybe_dump()
                     break
                 else:
                     print("Invalid input\n")
 
 
 if __name__ == '__main__':  # main program
-    file_path = 'wordles.txt'  # Path to the text file
+    parser = argparse.ArgumentParser(description="Play Wordle in the terminal.")
+    parser.add_argument("--words", default="wordles.txt", help="path to the word list")
+    parser.add_argument("--length", type=int, default=5, choices=range(4, 13), metavar="{4..12}",
+                        help="number of letters of the words to play with")
+    parser.add_argument("--strategy", choices=AutoplayMode.STRATEGIES, default="random",
+                        help="how the computer picks its guesses in the auto game")
+    parser.add_argument("--profile", metavar="FILE", help="run under cProfile and write the statistics to FILE")
+    parser.add_argument("--metrics", metavar="FILE", help="record the phase timings and dump them to FILE")
+    parser.add_argument("--metrics-format", choices=Metrics.FORMATS, default="json", help="format of the metrics dump")
+    parser.add_argument("--metrics-interval", type=float, default=10.0,
+                        help="minimum number of seconds between two metrics dumps")
+    args = parser.parse_args()
+
+    file_path = args.words  # Path to the text file
     words_list = []
-    word_length = 5
+    word_length = args.length
+    metrics = None
+    if args.metrics:
+        metrics = Metrics(args.metrics, args.metrics_format, args.metrics_interval)
 
-    file_handler = FileHandler(file_path, words_list)
-    words_list = file_handler.get_words_from_file()
+    try:
+        try:
+            # Map the packed words and their derived indexes from the binary cache next to the word list
+            word_cache = WordCache(file_path, word_length).get()
+            words_list, sorter, index = word_cache.store, word_cache.sorter, word_cache.index
+        except OSError:
+            # The cache cannot be written (e.g. a read-only directory), so the words are read and indexed directly
+            file_handler = FileHandler(file_path, words_list)
+            words_list, sorter, index = file_handler.get_indexed_words(word_length)
+    except WordListError as error:
+        print("Error: " + str(error))
+        quit()
 
     if not words_list:
         print("The word list is empty. Please check the file and try again.")
     else:
-        main_game = WordleGame(words_list)
-        sorter = FrequencySorter(words_list)
-        validator = WordValidator(words_list, word_length)
+        try:
+            main_game = WordleGame(words_list, index, sorter, metrics, args.strategy)
+        except (ValueError, RuntimeError) as error:  # e.g. the "entropy" strategy without NumPy
+            print("Error: " + str(error))
+            quit()
 
-        main_game.main_game()
+        profiler = cProfile.Profile() if args.profile else None
+        try:
+            if profiler is not None:
+                profiler.enable()
+            main_game.main_game()
+        finally:
+            # The game ends with quit(), so the results are written on the way out
+            if profiler is not None:
+                profiler.disable()
+                profiler.dump_stats(args.profile)
+            if metrics is not None:
+                metrics.dump()